@@ -0,0 +1,27 @@
+"""Moteur de simulation d'engagement CIWS contre missile antinavire.
+
+Utilisation :
+    from simulateur import Scenario, Simulation
+    results = Simulation().run(Scenario(jamming_level=0.5))
+"""
+import importlib
+
+# Noms publics -> sous-module, importés à la première utilisation : "import simulateur" reste immédiat
+_EXPORTS = {
+    'Missile': 'modele',
+    'CIWS': 'modele',
+    'EXOCET_MM40': 'modele',
+    'Catalogue': 'catalogue',
+    'Scenario': 'simulation',
+    'Simulation': 'simulation',
+    'IncrementalSimulation': 'recalcul',
+    'ResultStore': 'resultats',
+    'TrajectoryCache': 'trajectoires',
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
@@ -0,0 +1,6 @@
+"""Point d'entrée : python -m simulateur {run,sweep,plot,replay,watch,bench} (voir simulateur.cli)."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
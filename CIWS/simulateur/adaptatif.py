@@ -0,0 +1,166 @@
+"""Intégration à pas adaptatif des hits attendus, découpée aux frontières de phase calculées analytiquement.
+
+Vérification : python -m simulateur.adaptatif
+"""
+import sys
+
+import numpy as np
+
+
+def hit_rate(missile, profile, times):
+    # Hits attendus par seconde pour un EngagementProfile : le calcul est linéaire en dt, évalué avec dt = 1
+    times = np.asarray(times, dtype=float)
+    distances = missile.positions(times, missile.range / missile.speed, profile.mode)[0]
+    return profile.expected_hits(times, distances, missile, 1.0)
+
+
+def engagement_breakpoints(missile, ciws, mode):
+    # Instants où l'intégrande change de régime : fenêtre d'engagement, début du zigzag, début du pop-up
+    total_time = missile.range / missile.speed
+    t_entry = (missile.range - ciws.max_range) / missile.speed
+    t_exit = (missile.range - ciws.min_range) / missile.speed
+
+    # Frontières de la trajectoire, vues à l'instant courant et à l'arrivée des projectiles (t + temps de vol)
+    trajectory_events = [total_time]
+    if mode == 2:
+        trajectory_events.append((missile.range - missile.zigzag_start) / missile.speed)
+    elif mode == 4:
+        trajectory_events.append((missile.range - missile.zigzag_start) / missile.speed - missile.popup_time)
+    if mode in [3, 4]:
+        trajectory_events.append(total_time - missile.popup_time)
+
+    # t + (range - speed * t) / projectile_speed = b  =>  t = (b - range / vp) / (1 - speed / vp)
+    ratio = missile.speed / ciws.projectile_speed
+    shifted = [(b - missile.range / ciws.projectile_speed) / (1 - ratio) for b in trajectory_events]
+
+    start, end = max(t_entry, 0.0), min(t_exit, total_time)
+    if end <= start:
+        return np.array([])
+    inner = [t for t in trajectory_events + shifted if start < t < end]
+    return np.unique([start, end] + inner)
+
+
+def _simpson(fa, fm, fb, width):
+    return width / 6 * (fa + 4 * fm + fb)
+
+
+def integrate_engagement(missile, ciws, mode, jamming_level=0.2, tol=1e-3, min_step=1e-6):
+    # Simpson adaptatif vectorisé : tous les intervalles d'un même niveau sont raffinés en un seul appel.
+    # tol est la tolérance absolue visée sur le total de hits, répartie entre intervalles selon leur largeur.
+    # Simpson à 3 et 5 points peuvent s'accorder par hasard sur un intervalle large : un intervalle qu'il accepte
+    # n'est gardé que si Gauss-Kronrod 15 points confirme, l'écart entre les deux servant d'estimation d'erreur.
+    from .quadrature import KRONROD_WEIGHTS, NODES
+
+    breakpoints = engagement_breakpoints(missile, ciws, mode)
+    result = {'hits': 0.0, 'error': 0.0, 'evaluations': 0, 'breakpoints': breakpoints,
+              'times': breakpoints[:1], 'cumulative_hits': np.zeros(min(1, len(breakpoints)))}
+    if len(breakpoints) < 2:
+        return result
+    profile = ciws.compile(mode, jamming_level)
+
+    def rate(t, a, b):
+        # Évaluation strictement à l'intérieur du segment pour ne pas tomber sur une discontinuité
+        margin = 1e-9 * (b - a)
+        result['evaluations'] += t.size
+        return hit_rate(missile, profile, np.clip(t, a + margin, b - margin))
+
+    def kronrod(a, b):
+        # Gauss-Kronrod 15 points sur chaque intervalle (nœuds intérieurs, pas besoin de marge)
+        center, half = (a + b) / 2, (b - a) / 2
+        nodes = (center[:, None] + half[:, None] * NODES).ravel()
+        result['evaluations'] += nodes.size
+        return half * (hit_rate(missile, profile, nodes).reshape(a.size, 15) @ KRONROD_WEIGHTS)
+
+    lo, hi = breakpoints[:-1], breakpoints[1:]
+    seg_lo, seg_hi = lo.copy(), hi.copy()
+    a, b = lo, hi
+    m = (a + b) / 2
+    fa, fm, fb = (rate(t, seg_lo, seg_hi) for t in (a, m, b))
+    whole = _simpson(fa, fm, fb, b - a)
+    interval_tol = tol * (b - a) / (breakpoints[-1] - breakpoints[0])
+
+    accepted_a, accepted_b, accepted_hits, accepted_fa, accepted_fb = [], [], [], [], []
+    error = 0.0
+    while a.size:
+        lm, rm = (a + m) / 2, (m + b) / 2
+        flm, frm = rate(lm, seg_lo, seg_hi), rate(rm, seg_lo, seg_hi)
+        left = _simpson(fa, flm, fm, m - a)
+        right = _simpson(fm, frm, fb, b - m)
+        delta = left + right - whole
+        refined = left + right + delta / 15  # extrapolation de Richardson
+        done = np.abs(delta) <= 15 * interval_tol
+        check = np.zeros_like(refined)
+        check[done] = kronrod(a[done], b[done])
+        done &= np.abs(check - refined) <= interval_tol
+        # Intervalle minimal : accepté tel quel, avec la plus grande des deux estimations d'erreur
+        forced = ~done & (b - a <= min_step)
+        done |= forced
+
+        accepted_a.append(a[done])
+        accepted_b.append(b[done])
+        accepted_hits.append(np.where(forced, refined, check)[done])
+        accepted_fa.append(fa[done])
+        accepted_fb.append(fb[done])
+        error += np.sum(np.maximum(np.abs(check - refined), np.abs(delta) / 15)[done])
+
+        # Les intervalles refusés sont coupés en deux moitiés, chacune avec la moitié de la tolérance
+        keep = ~done
+        a, m, b = (np.concatenate([a[keep], m[keep]]), np.concatenate([lm[keep], rm[keep]]),
+                   np.concatenate([m[keep], b[keep]]))
+        fa, fm, fb = (np.concatenate([fa[keep], fm[keep]]), np.concatenate([flm[keep], frm[keep]]),
+                      np.concatenate([fm[keep], fb[keep]]))
+        whole = np.concatenate([left[keep], right[keep]])
+        interval_tol = np.concatenate([interval_tol[keep], interval_tol[keep]]) / 2
+        seg_lo, seg_hi = np.concatenate([seg_lo[keep], seg_lo[keep]]), np.concatenate([seg_hi[keep], seg_hi[keep]])
+
+    starts = np.concatenate(accepted_a)
+    order = np.argsort(starts)
+    ends = np.concatenate(accepted_b)[order]
+    hits = np.concatenate(accepted_hits)[order]
+    result.update({
+        'hits': float(hits.sum()),
+        'error': float(error),
+        'times': np.concatenate([starts[order][:1], ends]),
+        'hits_per_sec': np.concatenate([np.concatenate(accepted_fa)[order], np.concatenate(accepted_fb)[order][-1:]]),
+        'cumulative_hits': np.concatenate([[0.0], np.cumsum(hits)]),
+    })
+    return result
+
+
+def integrate_catalog(missile, catalogue, modes, jamming_level=0.2, tol=1e-3):
+    # Totaux (système, mode) et estimations d'erreur pour tout le catalogue
+    hits = np.zeros((len(catalogue), len(modes)))
+    errors = np.zeros_like(hits)
+    for i, ciws in enumerate(catalogue.systems()):
+        for j, mode in enumerate(modes):
+            result = integrate_engagement(missile, ciws, mode, jamming_level, tol)
+            hits[i, j], errors[i, j] = result['hits'], result['error']
+    return hits, errors
+
+
+def check_integration(tol=1e-3, jamming_level=0.2, reference_tol=1e-11):
+    # Compare integrate_catalog à quadrature_catalog serré (référence) sur tout le catalogue et les quatre modes :
+    # l'écart doit rester sous tol et sous l'erreur annoncée. Retourne (conforme, écart max, pire rapport écart / erreur).
+    from .catalogue import Catalogue
+    from .modele import EXOCET_MM40, Missile
+    from .quadrature import quadrature_catalog
+
+    missile = Missile(**EXOCET_MM40)
+    catalogue = Catalogue.from_csv()
+    hits, errors = integrate_catalog(missile, catalogue, [1, 2, 3, 4], jamming_level, tol)
+    reference = quadrature_catalog(missile, catalogue, [1, 2, 3, 4], jamming_level, reference_tol)[0]
+    difference = np.abs(hits - reference)
+    ratio = float((difference / np.maximum(errors, reference_tol)).max())
+    ok = bool((difference <= tol).all() and (difference <= errors + reference_tol).all())
+    return ok, float(difference.max()), ratio
+
+
+def main():
+    ok, worst, ratio = check_integration()
+    print(f"Écart max à la référence Gauss-Kronrod {worst:.2e} (tol 1e-03), écart / erreur annoncée max {ratio:.2f} : "
+          f"{'OK' if ok else 'ÉCHEC'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Balayage de paramètres (brouillage, vitesse et portée du missile, pas de temps) réparti sur plusieurs processus."""
+import itertools
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .catalogue import Catalogue
+from .modele import EXOCET_MM40, Missile
+from .moteur import evaluate_catalog, evaluate_mode, evaluate_until_kill
+from .quadrature import quadrature_catalog
+from .resultats import summarize
+from .trajectoires import TrajectoryCache
+
+# Axes du balayage, dans l'ordre des dimensions du tableau de résultats
+SWEEP_AXES = ('jamming_level', 'speed', 'range', 'dt')
+# Niveaux de brouillage évalués ensemble par le moteur : borne la mémoire (système × bloc × temps) ; au-delà de
+# quelques dizaines, le gain de la diffusion est perdu en défauts de cache
+JAMMING_BLOCK = 16
+METHODS = ('steps', 'quadrature')
+
+
+class SweepResult:
+    # Résumés étiquetés, dimensions (brouillage, vitesse, portée, dt, système, mode) : totaux de hits, instant où
+    # le seuil de destruction est atteint et cadence maximale. Aucune série temporelle n'est conservée.
+    def __init__(self, axes, systems, modes, hits, kill_threshold, time_to_threshold=None, peak_rate=None):
+        self.axes = axes
+        self.systems = list(systems)
+        self.modes = list(modes)
+        self.hits = hits
+        self.kill_threshold = np.asarray(kill_threshold, dtype=float)
+        self.time_to_threshold = time_to_threshold
+        self.peak_rate = peak_rate
+
+    @property
+    def neutralized(self):
+        return self.hits >= self.kill_threshold[:, None]
+
+    @property
+    def range_at_threshold(self):
+        # Distance du missile au navire quand le seuil est atteint : portée initiale - vitesse * instant
+        speed = np.reshape(self.axes['speed'], (1, -1, 1, 1, 1, 1))
+        initial_range = np.reshape(self.axes['range'], (1, 1, -1, 1, 1, 1))
+        return initial_range - speed * self.time_to_threshold
+
+    def sel(self, field='hits', **coords):
+        # Sélection par valeur d'axe, ex. sel(jamming_level=0.2, system="Goalkeeper CIWS", mode=2)
+        # field : 'hits', 'time_to_threshold' ou 'peak_rate'
+        index = []
+        for axis, values in self.axes.items():
+            index.append(list(values).index(coords[axis]) if axis in coords else slice(None))
+        index.append(self.systems.index(coords['system']) if 'system' in coords else slice(None))
+        index.append(self.modes.index(coords['mode']) if 'mode' in coords else slice(None))
+        return getattr(self, field)[tuple(index)]
+
+    def jamming_cube(self, field='hits', **coords):
+        # Cube (système, mode, brouillage) à vitesse, portée et dt fixés (par défaut les premières valeurs)
+        coords = {axis: coords.get(axis, values[0]) for axis, values in self.axes.items() if axis != 'jamming_level'}
+        return np.moveaxis(self.sel(field, **coords), 0, -1)
+
+    def records(self):
+        # Une ligne par cellule : pratique pour un export CSV ou un DataFrame
+        for index in np.ndindex(self.hits.shape):
+            record = {axis: values[i] for (axis, values), i in zip(self.axes.items(), index)}
+            record['system'] = self.systems[index[-2]]
+            record['mode'] = self.modes[index[-1]]
+            record['hits'] = float(self.hits[index])
+            if self.time_to_threshold is not None:
+                record['time_to_threshold'] = float(self.time_to_threshold[index])
+                record['range_at_threshold'] = record['range'] - record['speed'] * record['time_to_threshold']
+                record['peak_rate'] = float(self.peak_rate[index])
+            record['neutralized'] = bool(self.hits[index] >= self.kill_threshold[index[-2]])
+            yield record
+
+
+def run_point(missile_params, catalogue, modes, jamming_level, speed, range, dt, method='steps', trajectories=None,
+              stop_at_kill=False):
+    # Un point de la grille : résumé (totaux, temps jusqu'au seuil, cadence maximale) de forme (3, système, mode).
+    # method='quadrature' intègre en continu (limite dt -> 0) : dt est ignoré et seuls les totaux sont calculés.
+    # trajectories : TrajectoryCache partagé entre points de même missile et même dt (ex. balayage du brouillage).
+    # stop_at_kill : chaque couple (système, mode) s'arrête à son seuil de destruction ; hits est alors le cumul
+    # au moment de la neutralisation et la cadence maximale ne porte que sur les pas évalués.
+    # jamming_level peut être une liste de niveaux : résumé de forme (3, brouillage, système, mode).
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method!r} (attendu : {', '.join(METHODS)})")
+    levels = np.asarray(jamming_level, dtype=float)
+    if levels.ndim and (method == 'quadrature' or stop_at_kill):
+        # Pas d'axe de brouillage diffusé pour ces méthodes : un calcul par niveau
+        return np.stack([run_point(missile_params, catalogue, modes, level, speed, range, dt, method, trajectories,
+                                   stop_at_kill) for level in levels], axis=1)
+    missile = Missile(**dict(missile_params, speed=speed, range=range))
+    if method == 'quadrature':
+        totals = quadrature_catalog(missile, catalogue, modes, jamming_level)[0]
+        return np.stack([totals, np.full_like(totals, np.nan), np.full_like(totals, np.nan)])
+    total_time = missile.range / missile.speed
+    time_array = np.arange(0, total_time + dt, dt)
+    if stop_at_kill:
+        result = evaluate_until_kill(missile, catalogue, modes, time_array, dt, jamming_level)
+        return np.stack([result['hits'], result['time_to_kill'], result['peak_rate']])
+    if levels.ndim:
+        return jamming_summaries(missile, catalogue, modes, time_array, dt, levels, trajectories)
+    hits = evaluate_catalog(missile, catalogue, modes, time_array, dt, jamming_level, cache=trajectories)
+    return np.stack(summarize(hits, dt, time_array, catalogue['kill_threshold']))
+
+
+def jamming_summaries(missile, catalogue, modes, time_array, dt, jamming_levels, trajectories=None):
+    # Résumés (3, brouillage, système, mode) de tous les niveaux en une passe : le moteur diffuse l'axe du
+    # brouillage par blocs de JAMMING_BLOCK niveaux, chaque bloc est résumé mode par mode puis libéré
+    levels = np.asarray(jamming_levels, dtype=float)
+    summaries = np.empty((3, len(levels), len(catalogue['name']), len(modes)))
+    for j, mode in enumerate(modes):
+        for start in range(0, len(levels), JAMMING_BLOCK):
+            block = slice(start, start + JAMMING_BLOCK)
+            hits = evaluate_mode(missile, catalogue, mode, time_array, dt, levels[block], cache=trajectories)
+            # hits (système, brouillage, temps) : summarize traite l'axe du brouillage comme celui des modes
+            summaries[:, block, :, j] = np.swapaxes(
+                np.stack(summarize(hits, dt, time_array, catalogue['kill_threshold'])), 1, 2)
+    return summaries
+
+
+def _run_chunk(missile_params, catalogue, modes, points, method, stop_at_kill):
+    trajectories = TrajectoryCache()
+    return [(index, run_point(missile_params, catalogue, modes, *values, method=method, trajectories=trajectories,
+                              stop_at_kill=stop_at_kill))
+            for index, values in points]
+
+
+def _print_progress(done, total):
+    sys.stderr.write(f"\rBalayage : {done}/{total} points")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def run_sweep(jamming_levels=(0.2,), speeds=None, ranges=None, dts=(0.01,), modes=(1, 2, 3, 4),
+              catalogue=None, missile_params=EXOCET_MM40, max_workers=None, chunk_size=None, progress=True,
+              method='steps', stop_at_kill=False):
+    catalogue = catalogue if catalogue is not None else Catalogue.from_csv()
+    axes = {
+        'jamming_level': list(jamming_levels),
+        'speed': list(speeds if speeds is not None else [missile_params['speed']]),
+        'range': list(ranges if ranges is not None else [missile_params['range']]),
+        'dt': list(dts),
+    }
+    shape = tuple(len(values) for values in axes.values())
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method!r} (attendu : {', '.join(METHODS)})")
+    # Méthode par pas : les niveaux de brouillage d'un point (vitesse, portée, dt) sont évalués par blocs de
+    # JAMMING_BLOCK (axe diffusé du moteur), chaque bloc étant une tâche répartie entre les processus ;
+    # sinon un point par niveau
+    if method == 'steps' and not stop_at_kill:
+        levels = axes['jamming_level']
+        jamming = [(slice(start, start + JAMMING_BLOCK), levels[start:start + JAMMING_BLOCK])
+                   for start in range(0, len(levels), JAMMING_BLOCK)]
+    else:
+        jamming = list(enumerate(axes['jamming_level']))
+    points = [((i,) + index, (level,) + values) for i, level in jamming
+              for index, values in zip(np.ndindex(shape[1:]), itertools.product(*list(axes.values())[1:]))]
+    summaries = np.zeros((3,) + shape + (len(catalogue), len(modes)))
+
+    if progress is True:
+        progress = _print_progress
+    max_workers = max_workers or os.cpu_count() or 1
+    # Plusieurs points par tâche pour amortir le coût de transfert entre processus
+    chunk_size = chunk_size or max(1, math.ceil(len(points) / (max_workers * 4)))
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+
+    done = 0
+    if max_workers == 1:
+        for chunk in chunks:
+            for index, summary in _run_chunk(missile_params, catalogue, modes, chunk, method, stop_at_kill):
+                summaries[(slice(None),) + index] = summary
+            done += len(chunk)
+            if progress:
+                progress(done, len(points))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_chunk, missile_params, catalogue, modes, chunk, method,
+                                       stop_at_kill) for chunk in chunks]
+            for future in as_completed(futures):
+                chunk_results = future.result()
+                for index, summary in chunk_results:
+                    summaries[(slice(None),) + index] = summary
+                done += len(chunk_results)
+                if progress:
+                    progress(done, len(points))
+
+    hits, time_to_threshold, peak_rate = summaries
+    return SweepResult(axes, catalogue['name'], modes, hits, catalogue['kill_threshold'], time_to_threshold, peak_rate)
@@ -0,0 +1,236 @@
+"""Banc de mesure des chemins critiques de la simulation, chaque mesure dans un processus isolé.
+
+Utilisation : python -m simulateur.bench [--filter motif] [--history fichier.json] [--threshold 0.10]
+"""
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+
+from .profilage import format_time
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = 'bench_history.json'
+DEFAULT_THRESHOLD = 0.10  # 10 % plus lent que la référence = régression
+REPEAT = 5
+
+
+def _scenario(dt=0.01):
+    import numpy as np
+    from .catalogue import Catalogue
+    from .modele import EXOCET_MM40, Missile
+
+    missile = Missile(**EXOCET_MM40)
+    catalogue = Catalogue.from_csv()
+    total_time = missile.range / missile.speed
+    time_array = np.arange(0, total_time + dt, dt)
+    return missile, catalogue, total_time, time_array
+
+
+def bench_missile_position():
+    missile, _, total_time, time_array = _scenario()
+    return lambda: [missile.position(t, total_time, 4) for t in time_array]
+
+
+def bench_missile_positions():
+    missile, _, total_time, time_array = _scenario()
+    return lambda: missile.positions(time_array, total_time, 4)
+
+
+def bench_simulate_intercept():
+    missile, catalogue, total_time, time_array = _scenario()
+    ciws = catalogue.ciws("Goalkeeper CIWS")
+    x_pos = missile.positions(time_array, total_time, 2)[0]
+    return lambda: [ciws.simulate_intercept(t, x, missile, 2, 0.01, 0.2) for t, x in zip(time_array, x_pos)]
+
+
+def bench_adjust_tracking_factor():
+    _, catalogue, _, _ = _scenario()
+    ciws = catalogue.ciws("Goalkeeper CIWS")
+    return lambda: ciws.adjust_tracking_factor(0.2)
+
+
+def bench_engagement_legacy():
+    # Boucle historique pas à pas : position() puis simulate_intercept() à chaque pas
+    missile, catalogue, total_time, time_array = _scenario()
+    ciws = catalogue.ciws("Goalkeeper CIWS")
+
+    def run():
+        total_hits = 0
+        for t in time_array:
+            if missile.range - missile.speed * t <= 0:
+                break
+            x, _, _ = missile.position(t, total_time, 4)
+            total_hits += ciws.simulate_intercept(t, x, missile, 4, 0.01, 0.2)
+        return total_hits
+    return run
+
+
+def bench_engagement_profile():
+    # Même boucle pas à pas, constantes du système compilées une fois hors de la boucle
+    missile, catalogue, total_time, time_array = _scenario()
+    profile = catalogue.ciws("Goalkeeper CIWS").compile(4, 0.2)
+
+    def run():
+        total_hits = 0
+        for t in time_array:
+            if missile.range - missile.speed * t <= 0:
+                break
+            x, _, _ = missile.position(t, total_time, 4)
+            total_hits += profile.expected_hit(t, x, missile, 0.01)
+        return total_hits
+    return run
+
+
+def bench_engagement_kernel():
+    missile, catalogue, total_time, time_array = _scenario()
+    ciws = catalogue.ciws("Goalkeeper CIWS")
+    x_pos = missile.positions(time_array, total_time, 4)[0]
+    return lambda: ciws.simulate_intercept_array(time_array, x_pos, missile, 4, 0.01, 0.2)
+
+
+def _bench_catalogue(dt):
+    def setup():
+        from .moteur import evaluate_catalog
+        missile, catalogue, _, time_array = _scenario(dt)
+        return lambda: evaluate_catalog(missile, catalogue, [1, 2, 3, 4], time_array, dt, 0.2)
+    return setup
+
+
+def _bench_catalogue_numba(dt):
+    def setup():
+        from . import natif
+        missile, catalogue, _, time_array = _scenario(dt)
+        natif.evaluate_catalog(missile, catalogue, [1], time_array, dt, 0.2)  # compilation hors mesure
+        return lambda: natif.evaluate_catalog(missile, catalogue, [1, 2, 3, 4], time_array, dt, 0.2)
+    return setup
+
+
+def _bench_legacy_script(script):
+    # Scripts historiques exécutés en entier (backend Agg, sortie console masquée)
+    def setup():
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        path = os.path.join(SCRIPT_DIR, script)
+        with open(path, encoding='utf-8') as f:
+            code = compile(f.read(), path, 'exec')
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                exec(code, {'__name__': '__main__', '__file__': path})
+            plt.close('all')
+        return run
+    return setup
+
+
+# Nom -> (fonction de préparation, nombre d'appels imposé ou None pour un réglage automatique)
+BENCHMARKS = {
+    'missile.position': (bench_missile_position, None),
+    'missile.positions': (bench_missile_positions, None),
+    'ciws.simulate_intercept': (bench_simulate_intercept, None),
+    'ciws.adjust_tracking_factor': (bench_adjust_tracking_factor, None),
+    'engagement.legacy': (bench_engagement_legacy, None),
+    'engagement.profile': (bench_engagement_profile, None),
+    'engagement.kernel': (bench_engagement_kernel, None),
+    'catalogue.dt=0.05': (_bench_catalogue(0.05), None),
+    'catalogue.dt=0.01': (_bench_catalogue(0.01), None),
+    'catalogue.dt=0.001': (_bench_catalogue(0.001), None),
+    'catalogue.natif.dt=0.01': (_bench_catalogue_numba(0.01), None),
+    'catalogue.natif.dt=0.001': (_bench_catalogue_numba(0.001), None),
+    'legacy.Test_1': (_bench_legacy_script('Test_1.py'), 1),
+    'legacy.Test_2': (_bench_legacy_script('Test_2.py'), 1),
+    'legacy.Test_3': (_bench_legacy_script('Test_3.py'), 1),
+}
+
+
+def measure(name, repeat=REPEAT):
+    # Meilleur temps par appel (s) sur `repeat` séries, dans le processus courant
+    setup, number = BENCHMARKS[name]
+    timer = timeit.Timer(setup())
+    if number is None:
+        number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'best': min(times), 'mean': sum(times) / len(times), 'number': number, 'repeat': repeat}
+
+
+def measure_isolated(name, repeat=REPEAT):
+    # Chaque mesure dans un interpréteur neuf : pas de caches ni d'imports partagés entre mesures
+    output = subprocess.run([sys.executable, '-m', 'simulateur.bench', '--single', name, '--repeat', str(repeat)],
+                            cwd=SCRIPT_DIR, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_regressions(results, history, threshold=DEFAULT_THRESHOLD):
+    # Compare chaque mesure à la dernière exécution enregistrée qui la contient
+    regressions = []
+    for name, result in results.items():
+        previous = next((entry['results'][name] for entry in reversed(history) if name in entry['results']), None)
+        if previous is not None and result['best'] > previous['best'] * (1 + threshold):
+            regressions.append((name, previous['best'], result['best']))
+    return regressions
+
+
+def run(names, history_path=DEFAULT_HISTORY, threshold=DEFAULT_THRESHOLD, save=True, repeat=REPEAT):
+    history = load_history(history_path)
+    results = {}
+    print(f"{'Mesure':<30} | {'Meilleur':>12} | {'Moyenne':>12} | {'Référence':>12}")
+    print("-" * 76)
+    for name in names:
+        results[name] = measure_isolated(name, repeat)
+        previous = next((entry['results'][name] for entry in reversed(history) if name in entry['results']), None)
+        reference = format_time(previous['best']) if previous else '-'
+        print(f"{name:<30} | {format_time(results[name]['best']):>12} | {format_time(results[name]['mean']):>12} | "
+              f"{reference:>12}")
+
+    regressions = check_regressions(results, history, threshold)
+    for name, before, after in regressions:
+        print(f"RÉGRESSION {name} : {format_time(before)} -> {format_time(after)} (+{after / before - 1:.0%})")
+
+    if save:
+        history.append({'date': datetime.datetime.now().isoformat(timespec='seconds'), 'results': results})
+        with open(history_path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2)
+    return results, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure de la simulation CIWS")
+    parser.add_argument('--filter', default='*', help="motif de sélection des mesures (ex. 'catalogue.*')")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="historique JSON des mesures")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="seuil de régression (0.10 = 10 %%)")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--no-save', action='store_true', help="ne pas ajouter cette exécution à l'historique")
+    parser.add_argument('--list', action='store_true', help="lister les mesures disponibles")
+    parser.add_argument('--single', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        print(json.dumps(measure(args.single, args.repeat)))
+        return 0
+    names = [name for name in BENCHMARKS if fnmatch.fnmatch(name, args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    start = time.perf_counter()
+    _, regressions = run(names, args.history, args.threshold, not args.no_save, args.repeat)
+    print(f"\n{len(names)} mesures en {time.perf_counter() - start:.1f} s")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
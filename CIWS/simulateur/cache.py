@@ -0,0 +1,174 @@
+"""Cache disque des résultats d'engagement, adressé par le contenu des paramètres de simulation."""
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+from .modele import MODEL_VERSION
+from .moteur import build_results, evaluate_catalog
+from .profilage import phase
+from .trajectoires import TrajectoryCache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_CACHE_DIR = os.environ.get('CIWS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'ciws'))
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+EVICT_TARGET = 0.9  # une éviction redescend à 90 % de max_bytes, pour ne pas reparcourir le répertoire à chaque écriture
+RESULT_ARRAYS = ('x', 'y', 'z', 'hits_per_sec', 'cumulative_hits')
+
+
+def _plain(value):
+    # Paramètres convertis en types JSON stables (les scalaires NumPy n'ont pas de représentation JSON)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def cache_key(missile, ciws, mode, dt, jamming_level):
+    payload = {
+        'model_version': MODEL_VERSION,
+        'missile': _plain(vars(missile)),
+        'ciws': _plain(vars(ciws)),
+        'mode': mode,
+        'dt': float(dt),
+        'jamming_level': float(jamming_level),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npy')
+
+    @contextmanager
+    def _lock(self):
+        # Verrou exclusif sur tout le répertoire, partagé entre processus
+        with open(os.path.join(self.directory, '.lock'), 'a+b') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            data = np.load(path)
+            os.utime(path)  # Date d'accès pour l'éviction LRU
+        except (OSError, ValueError):
+            return None
+        # Un seul tableau .npy : le total, puis les séries temporelles bout à bout
+        result = dict(zip(RESULT_ARRAYS, data[1:].reshape(len(RESULT_ARRAYS), -1)))
+        result['hits'] = data[0]
+        return result
+
+    def put(self, key, result):
+        # Écriture dans un fichier temporaire puis renommage atomique : un lecteur ne voit jamais un fichier partiel
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.concatenate([[result['hits']]] + [result[name] for name in RESULT_ARRAYS]))
+        size = os.path.getsize(tmp_path)
+        path = self._path(key)
+        with self._lock():
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            # Taille totale tenue à jour dans .size : le répertoire n'est parcouru que pour évincer, ou si le
+            # total est absent ou illisible (répertoire créé par une version antérieure)
+            total = self._read_total()
+            total = self._evict(self.max_bytes) if total is None else total + size - replaced
+            if total > self.max_bytes:
+                total = self._evict(EVICT_TARGET * self.max_bytes)
+            self._write_total(total)
+
+    def _read_total(self):
+        try:
+            with open(os.path.join(self.directory, '.size'), encoding='ascii') as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_total(self, total):
+        with open(os.path.join(self.directory, '.size'), 'w', encoding='ascii') as f:
+            f.write(str(total))
+
+    def _evict(self, limit):
+        # Supprime les entrées les moins récemment utilisées jusqu'à repasser sous limit ; retourne la taille
+        # totale restante
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    def clear(self):
+        with self._lock():
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.npy'):
+                    os.remove(entry.path)
+            self._write_total(0)
+
+
+def cached_results(cache, missile, catalogue, modes, time_array, dt, jamming_level=0.2):
+    # results[nom][mode] lus depuis le cache ; seules les cellules absentes sont recalculées
+    systems = {name: catalogue.ciws(name) for name in catalogue['name']}
+    keys = {(name, mode): cache_key(missile, ciws, mode, dt, jamming_level)
+            for name, ciws in systems.items() for mode in modes}
+    results = {name: {} for name in systems}
+    missing = set()
+    with phase('cache.lecture'):
+        for (name, mode), key in keys.items():
+            result = cache.get(key)
+            if result is None:
+                missing.add((name, mode))
+            else:
+                results[name][mode] = result
+    if not missing:
+        return results
+
+    missing_names = [name for name in catalogue['name'] if any((name, mode) in missing for mode in modes)]
+    missing_modes = [mode for mode in modes if any((name, mode) in missing for name in missing_names)]
+    subset = catalogue.subset(missing_names)
+    trajectories = TrajectoryCache()
+    hits = evaluate_catalog(missile, subset, missing_modes, time_array, dt, jamming_level, cache=trajectories)
+    with phase('résultats'):
+        computed = build_results(missile, subset, missing_modes, time_array, dt, hits, cache=trajectories)
+    with phase('cache.écriture'):
+        for name, mode in missing:
+            results[name][mode] = computed[name][mode]
+            cache.put(keys[(name, mode)], computed[name][mode])
+    return results
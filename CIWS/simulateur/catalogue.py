@@ -0,0 +1,123 @@
+"""Catalogue des systèmes CIWS stocké en colonnes NumPy et chargé depuis un fichier CSV."""
+import csv
+import os
+
+import numpy as np
+
+from .modele import CIWS
+from .moteur import FRAGMENTATION_TYPES, stack_catalog
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'donnees')
+CATALOGUE_FILE = os.path.join(DATA_DIR, 'catalogue_ciws.csv')
+FUSES_FILE = os.path.join(DATA_DIR, 'fusees.csv')
+
+# Type de chaque colonne du fichier catalogue
+COLUMN_TYPES = {
+    'fire_rate_rpm': float,
+    'projectile_speed': float,
+    'max_range': float,
+    'min_range': float,
+    'dispersion_angle': float,
+    'base_tracking_factor': float,
+    'kill_threshold': float,
+    'radar_local': bool,
+    'eo_sensor': bool,
+    'variable_rate': bool,
+}
+FRAGMENTATION_NAMES = {code: name for name, code in FRAGMENTATION_TYPES.items()}
+
+
+def load_fuses(path=FUSES_FILE):
+    # Profils de fusée de proximité partagés entre systèmes : {identifiant: dict proximity_fuse}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['fuse']: {'explosion_distance': float(row['explosion_distance']),
+                              'dispersion_angle': float(row['dispersion_angle']),
+                              'fragments': int(row['fragments']),
+                              'fragmentation_type': row['fragmentation_type']}
+                for row in csv.DictReader(f)}
+
+
+class Catalogue:
+    def __init__(self, columns):
+        self.columns = columns
+        self.index = {name: i for i, name in enumerate(columns['name'])}
+
+    @classmethod
+    def from_csv(cls, path=CATALOGUE_FILE, fuses_path=FUSES_FILE):
+        fuses = load_fuses(fuses_path)
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            raw = dict(zip(header, zip(*reader)))
+
+        columns = {'name': np.array(raw['name'], dtype=object)}
+        for column, kind in COLUMN_TYPES.items():
+            values = np.array(raw[column], dtype=float)
+            columns[column] = values.astype(bool) if kind is bool else values
+        columns['fire_rate'] = columns['fire_rate_rpm'] / 60  # RPM -> RPS
+
+        # Colonnes de la fusée de proximité, résolues depuis les profils partagés
+        unknown = set(raw['fuse']) - set(fuses) - {''}
+        if unknown:
+            raise ValueError(f"Profil de fusée inconnu dans {path} : {', '.join(sorted(unknown))}")
+        profiles = [fuses.get(fuse, {}) for fuse in raw['fuse']]
+        columns['explosion_distance'] = np.array([p.get('explosion_distance', 0) for p in profiles], dtype=float)
+        columns['fuse_dispersion_angle'] = np.array([p.get('dispersion_angle', 0) for p in profiles], dtype=float)
+        columns['fragments'] = np.array([p.get('fragments', 0) for p in profiles], dtype=float)
+        columns['fragmentation_type'] = np.array(
+            [FRAGMENTATION_TYPES.get(p.get('fragmentation_type'), 0) for p in profiles], dtype=np.int8)
+        return cls(columns)
+
+    @classmethod
+    def from_systems(cls, ciws_systems):
+        return cls(stack_catalog(ciws_systems))
+
+    def __len__(self):
+        return len(self.columns['name'])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def row(self, name):
+        return self.index[name]
+
+    def subset(self, names):
+        rows = np.array([self.index[name] for name in names], dtype=int)
+        return Catalogue({column: values[rows] for column, values in self.columns.items()})
+
+    def replace(self, name, **changes):
+        # Copie du catalogue où une ligne est modifiée, ex. catalogue.replace("Goalkeeper CIWS", kill_threshold=15)
+        unknown = set(changes) - set(self.columns)
+        if unknown:
+            raise KeyError(f"Colonnes inconnues : {', '.join(sorted(unknown))}")
+        if 'fire_rate' in changes:
+            changes['fire_rate_rpm'] = changes.pop('fire_rate') * 60
+        if 'fire_rate_rpm' in changes:
+            changes['fire_rate'] = changes['fire_rate_rpm'] / 60
+        columns = {column: values.copy() for column, values in self.columns.items()}
+        i = self.index[name]
+        for column, value in changes.items():
+            columns[column][i] = value
+        return Catalogue(columns)
+
+    def ciws(self, name):
+        # Construit l'objet CIWS d'une ligne à la demande
+        i = self.index[name]
+        c = self.columns
+        proximity_fuse = None
+        if c['fragmentation_type'][i]:
+            proximity_fuse = {'explosion_distance': float(c['explosion_distance'][i]),
+                              'dispersion_angle': float(c['fuse_dispersion_angle'][i]),
+                              'fragments': int(c['fragments'][i]),
+                              'fragmentation_type': FRAGMENTATION_NAMES[int(c['fragmentation_type'][i])]}
+        return CIWS(name, float(c['fire_rate_rpm'][i]), float(c['projectile_speed'][i]), float(c['max_range'][i]),
+                    float(c['min_range'][i]), float(c['dispersion_angle'][i]), float(c['base_tracking_factor'][i]),
+                    float(c['kill_threshold'][i]), bool(c['radar_local'][i]), bool(c['eo_sensor'][i]),
+                    proximity_fuse, bool(c['variable_rate'][i]))
+
+    def systems(self):
+        for name in self.columns['name']:
+            yield self.ciws(name)
@@ -0,0 +1,278 @@
+"""Interface en ligne de commande : python -m simulateur {run,sweep,plot,replay,watch,bench} ...
+
+Seul le module de la sous-commande choisie est importé : l'aide et bench ne chargent ni NumPy ni SciPy,
+et Matplotlib n'est chargé que par plot et replay.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+MODES = (1, 2, 3, 4)
+
+
+def _write_records(records, output, fmt):
+    # Enregistrements (dictionnaires plats) en JSON ou CSV, vers un fichier ou la sortie standard
+    records = list(records)
+    if fmt == 'json':
+        # NaN (seuil jamais atteint) n'existe pas en JSON strict : écrit null
+        records = [{key: None if isinstance(value, float) and value != value else value
+                    for key, value in record.items()} for record in records]
+    stream = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+    try:
+        if fmt == 'json':
+            json.dump(records, stream, indent=2, ensure_ascii=False)
+            stream.write('\n')
+        elif records:
+            writer = csv.DictWriter(stream, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+    finally:
+        if output:
+            stream.close()
+
+
+def _missile_params(args):
+    from .modele import EXOCET_MM40
+
+    params = dict(EXOCET_MM40)
+    for key in ('speed', 'range'):
+        if getattr(args, key, None) is not None:
+            params[key] = getattr(args, key)
+    return params
+
+
+def _catalogue(args):
+    from .catalogue import Catalogue
+
+    catalogue = Catalogue.from_csv(args.catalogue) if args.catalogue else Catalogue.from_csv()
+    if getattr(args, 'systems', None):
+        unknown = [name for name in args.systems if name not in catalogue]
+        if unknown:
+            raise SystemExit(f"Systèmes inconnus : {', '.join(unknown)}")
+        catalogue = catalogue.subset(args.systems)
+    return catalogue
+
+
+def cmd_run(args):
+    from .simulation import Scenario, Simulation
+
+    scenario = Scenario(missile=_missile_params(args), modes=tuple(args.modes), dt=args.dt,
+                        jamming_level=args.jamming)
+    results = Simulation(_catalogue(args)).run(scenario, summary_only=True)
+    records = []
+    for i, name in enumerate(results.names):
+        for j, mode in enumerate(results.modes):
+            records.append({
+                'system': name, 'mode': mode,
+                'hits': float(results.totals[i, j]),
+                'neutralized': bool(results.neutralized[i, j]),
+                'time_to_threshold': float(results.time_to_threshold[i, j]),
+                'peak_rate': float(results.peak_rate[i, j]),
+            })
+    _write_records(records, args.output, args.format)
+    return 0
+
+
+def cmd_sweep(args):
+    from .balayage import run_sweep
+
+    catalogue = _catalogue(args)
+    if args.jamming_grid:
+        import numpy as np
+
+        start, stop, count = args.jamming_grid
+        args.jamming = np.linspace(start, stop, int(count)).round(10).tolist()
+    result = run_sweep(jamming_levels=args.jamming, speeds=args.speeds, ranges=args.ranges, dts=args.dts,
+                       modes=args.modes, catalogue=catalogue, missile_params=_missile_params(args),
+                       max_workers=args.workers, progress=not args.quiet, method=args.method,
+                       stop_at_kill=args.stop_at_kill)
+    _write_records(({key: value.item() if hasattr(value, 'item') else value for key, value in record.items()}
+                    for record in result.records()), args.output, args.format)
+    if args.heatmaps:
+        from .rendu import plot_jamming_heatmaps
+
+        # Première vitesse, première portée et premier dt de la grille
+        plot_jamming_heatmaps(result.jamming_cube(), result.systems, result.modes, result.axes['jamming_level'],
+                              result.kill_threshold, args.heatmaps, dpi=150)
+        print(args.heatmaps, file=sys.stderr)
+    return 0
+
+
+def cmd_plot(args):
+    from .cache import ResultCache, cached_results
+    from .rendu import render_report
+    from .simulation import Scenario
+
+    catalogue = _catalogue(args)
+    scenario = Scenario(missile=_missile_params(args), modes=tuple(args.modes), dt=args.dt,
+                        jamming_level=args.jamming)
+    cache = ResultCache(args.cache_dir) if args.cache_dir else ResultCache()
+    time_array = scenario.time_array()
+    results = cached_results(cache, scenario.build_missile(), catalogue, scenario.modes, time_array, scenario.dt,
+                             scenario.jamming_level)
+    kill_thresholds = dict(zip(catalogue['name'], catalogue['kill_threshold']))
+    options = {'selected_ciws': list(catalogue['name'])} if args.all_systems else {}
+    files = render_report(results, kill_thresholds, scenario.modes, time_array, scenario.jamming_level,
+                          output_dir=args.output_dir, quality=args.quality, max_workers=args.workers, **options)
+    print("\n".join(files))
+    return 0
+
+
+def cmd_replay(args):
+    from .cache import ResultCache, cached_results
+    from .rejeu import export_replay
+    from .simulation import Scenario
+
+    catalogue = _catalogue(args)
+    if args.system not in catalogue:
+        raise SystemExit(f"Système inconnu : {args.system}")
+    catalogue = catalogue.subset([args.system])
+    scenario = Scenario(missile=_missile_params(args), modes=tuple(args.modes), dt=args.dt,
+                        jamming_level=args.jamming)
+    cache = ResultCache(args.cache_dir) if args.cache_dir else ResultCache()
+    time_array = scenario.time_array()
+    results = cached_results(cache, scenario.build_missile(), catalogue, scenario.modes, time_array, scenario.dt,
+                             scenario.jamming_level)
+    try:
+        frames = export_replay(results, args.system, scenario.modes, time_array, args.output,
+                               kill_threshold=float(catalogue['kill_threshold'][0]), fps=args.fps,
+                               speed=args.speed_up, dpi=args.dpi)
+    except RuntimeError as error:
+        # ffmpeg absent (MP4) ou en échec
+        raise SystemExit(str(error))
+    print(f"{args.output} ({frames} images)")
+    return 0
+
+
+def cmd_watch(args):
+    from .catalogue import CATALOGUE_FILE, FUSES_FILE, Catalogue
+    from .recalcul import IncrementalSimulation, print_changes, watch
+    from .simulation import Scenario
+
+    path = args.catalogue or CATALOGUE_FILE
+    scenario = Scenario(missile=_missile_params(args), modes=tuple(args.modes), dt=args.dt,
+                        jamming_level=args.jamming)
+    simulation = IncrementalSimulation(scenario, Catalogue.from_csv(path, args.fuses or FUSES_FILE))
+    simulation.update()
+    print(f"Surveillance de {path} ({len(simulation.catalogue)} systèmes) ; Ctrl+C pour arrêter", flush=True)
+    try:
+        watch(simulation, path, args.fuses or FUSES_FILE, interval=args.interval,
+              callback=lambda simulation: print_changes(simulation) or sys.stdout.flush())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_bench(args):
+    from . import bench
+
+    return bench.main(args.bench_args)
+
+
+def _add_scenario_arguments(parser, sweep=False):
+    parser.add_argument('--catalogue', help="fichier CSV du catalogue (défaut : simulateur/donnees/catalogue_ciws.csv)")
+    parser.add_argument('--modes', type=int, nargs='+', default=list(MODES), choices=MODES)
+    if sweep:
+        parser.add_argument('--jamming', type=float, nargs='+', default=[0.2], help="niveaux de brouillage")
+        parser.add_argument('--jamming-grid', type=float, nargs=3, metavar=('START', 'STOP', 'N'),
+                            help="N niveaux de brouillage régulièrement espacés (remplace --jamming)")
+        parser.add_argument('--speeds', type=float, nargs='+', help="vitesses du missile (m/s)")
+        parser.add_argument('--ranges', type=float, nargs='+', help="portées initiales du missile (m)")
+        parser.add_argument('--dts', type=float, nargs='+', default=[0.01], help="pas de temps (s)")
+    else:
+        parser.add_argument('--jamming', type=float, default=0.2, help="niveau de brouillage (0 à 1)")
+        parser.add_argument('--speed', type=float, help="vitesse du missile (m/s)")
+        parser.add_argument('--range', type=float, help="portée initiale du missile (m)")
+        parser.add_argument('--dt', type=float, default=0.01, help="pas de temps (s)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m simulateur', description="Simulation d'engagement CIWS")
+    parser.add_argument('--profile', action='store_true',
+                        help="temps par phase et par fonction en fin d'exécution (sortie d'erreur)")
+    parser.add_argument('--profile-output', metavar='PSTATS',
+                        help="comme --profile, avec en plus un profil cProfile enregistré dans ce fichier")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="un scénario : totaux, neutralisation, temps jusqu'au seuil")
+    _add_scenario_arguments(run)
+    run.add_argument('--systems', nargs='+', help="noms des systèmes (défaut : tout le catalogue)")
+    run.add_argument('--format', choices=('json', 'csv'), default='json')
+    run.add_argument('--output', help="fichier de sortie (défaut : sortie standard)")
+    run.set_defaults(handler=cmd_run)
+
+    sweep = subparsers.add_parser('sweep', help="grille de paramètres (brouillage × vitesse × portée × dt)")
+    _add_scenario_arguments(sweep, sweep=True)
+    sweep.add_argument('--systems', nargs='+', help="noms des systèmes (défaut : tout le catalogue)")
+    sweep.add_argument('--workers', type=int, help="nombre de processus (1 = sans parallélisme)")
+    sweep.add_argument('--method', choices=('steps', 'quadrature'), default='steps')
+    sweep.add_argument('--stop-at-kill', action='store_true', help="arrêter chaque engagement au seuil")
+    sweep.add_argument('--format', choices=('json', 'csv'), default='csv')
+    sweep.add_argument('--output', help="fichier de sortie (défaut : sortie standard)")
+    sweep.add_argument('--quiet', action='store_true', help="pas d'avancement sur la sortie d'erreur")
+    sweep.add_argument('--heatmaps', metavar='PNG',
+                       help="cartes (système × brouillage) par mode, à la première vitesse, portée et dt")
+    sweep.set_defaults(handler=cmd_sweep, speed=None, range=None)
+
+    plot = subparsers.add_parser('plot', help="graphiques du rapport, à partir du cache de résultats")
+    _add_scenario_arguments(plot)
+    plot.add_argument('--output-dir', default='.')
+    plot.add_argument('--quality', choices=('draft', 'publication'), default='publication')
+    plot.add_argument('--cache-dir', help="répertoire du cache (défaut : CIWS_CACHE_DIR ou ~/.cache/ciws)")
+    plot.add_argument('--workers', type=int, help="nombre de processus de rendu")
+    plot.add_argument('--all-systems', action='store_true',
+                      help="trajectoires et séries temporelles de tout le catalogue (défaut : systèmes choisis)")
+    plot.set_defaults(handler=cmd_plot)
+
+    replay = subparsers.add_parser('replay', help="rejeu 3D d'un engagement en MP4 (ffmpeg) ou GIF")
+    _add_scenario_arguments(replay)
+    replay.add_argument('--system', required=True, help="nom du système")
+    replay.add_argument('--output', default='rejeu.gif', help="fichier .mp4 ou .gif")
+    replay.add_argument('--fps', type=float, default=25, help="images par seconde de la vidéo")
+    replay.add_argument('--speed-up', type=float, default=1.0, help="secondes simulées par seconde de vidéo")
+    replay.add_argument('--dpi', type=int, default=100)
+    replay.add_argument('--cache-dir', help="répertoire du cache (défaut : CIWS_CACHE_DIR ou ~/.cache/ciws)")
+    replay.set_defaults(handler=cmd_replay)
+
+    watch = subparsers.add_parser('watch', help="recalcule les cellules touchées à chaque modification du catalogue")
+    _add_scenario_arguments(watch)
+    watch.add_argument('--fuses', help="fichier CSV des profils de fusée (défaut : simulateur/donnees/fusees.csv)")
+    watch.add_argument('--interval', type=float, default=1.0, help="période de relevé des fichiers (s)")
+    watch.set_defaults(handler=cmd_watch)
+
+    # Les options de bench sont transmises telles quelles à simulateur.bench (voir main)
+    bench = subparsers.add_parser('bench', help="banc de mesure (options de python -m simulateur.bench)",
+                                  add_help=False)
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == 'bench':
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"arguments non reconnus : {' '.join(extra)}")
+    profile = args.profile or args.profile_output is not None
+    if profile:
+        from . import profilage
+
+        profilage.enable(args.profile_output)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Sortie redirigée vers une commande fermée avant la fin (ex. | head) : la sortie standard est redirigée
+        # vers os.devnull pour que le vidage à la fermeture de Python ne lève pas une seconde erreur
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if profile:
+            profilage.finish(sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
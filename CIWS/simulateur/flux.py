@@ -0,0 +1,171 @@
+"""Engagement diffusé par blocs de pas de temps, lu par des consommateurs enfichables (totaux, seuils, fichier, tracé)."""
+import csv
+from dataclasses import dataclass
+
+import numpy as np
+
+from .moteur import evaluate_catalog, impact_step
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class EngagementChunk:
+    # Bloc de pas consécutifs : hits attendus par pas, de forme (système, mode, pas du bloc)
+    start: int  # indice du premier pas dans la grille complète
+    times: np.ndarray
+    hits: np.ndarray
+    last: bool  # dernier bloc avant l'impact
+
+
+def stream_engagement(missile, catalog, modes, time_array, dt, jamming_level=0.2, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Générateur de blocs : seule la mémoire d'un bloc est utilisée, quelle que soit la longueur de la grille.
+    # La génération s'arrête au pas d'impact ; le consommateur peut l'interrompre plus tôt (close()).
+    time_array = np.asarray(time_array, dtype=float)
+    n_steps = impact_step(missile, time_array)
+    for start in range(0, n_steps, chunk_size):
+        times = time_array[start:min(start + chunk_size, n_steps)]
+        hits = evaluate_catalog(missile, catalog, modes, times, dt, jamming_level)
+        yield EngagementChunk(start, times, hits, start + chunk_size >= n_steps)
+
+
+class Consumer:
+    # consume() reçoit chaque bloc et retourne True quand il n'a plus besoin de la suite
+    def consume(self, chunk):
+        return False
+
+    def close(self):
+        pass
+
+
+class RunningTotals(Consumer):
+    def __init__(self):
+        self.totals = None
+        self.steps = 0
+
+    def consume(self, chunk):
+        totals = chunk.hits.sum(axis=2)
+        self.totals = totals if self.totals is None else self.totals + totals
+        self.steps += len(chunk.times)
+        return False
+
+
+class ThresholdDetector(Consumer):
+    # Instant où les hits cumulés atteignent le seuil de destruction de chaque système (NaN si jamais).
+    # stop='all' interrompt le flux quand toutes les cellules (système, mode) l'ont atteint, 'any' dès la première.
+    def __init__(self, kill_threshold, stop=None):
+        if stop not in (None, 'any', 'all'):
+            raise ValueError(f"Critère d'arrêt inconnu : {stop!r}")
+        self.kill_threshold = np.asarray(kill_threshold, dtype=float)
+        self.stop = stop
+        self.cumulative = None
+        self.time_to_threshold = None
+
+    def consume(self, chunk):
+        if self.cumulative is None:
+            self.cumulative = np.zeros(chunk.hits.shape[:2])
+            self.time_to_threshold = np.full(chunk.hits.shape[:2], np.nan)
+        cumulative = self.cumulative[:, :, None] + np.cumsum(chunk.hits, axis=2)
+        reached = cumulative >= self.kill_threshold[:, None, None]
+        new = reached.any(axis=2) & np.isnan(self.time_to_threshold)
+        self.time_to_threshold[new] = chunk.times[reached.argmax(axis=2)[new]]
+        self.cumulative = cumulative[:, :, -1]
+
+        detected = ~np.isnan(self.time_to_threshold)
+        if self.stop == 'all':
+            return bool(detected.all())
+        if self.stop == 'any':
+            return bool(detected.any())
+        return False
+
+
+class FileWriter(Consumer):
+    # Écrit les hits par pas en CSV au fil de l'eau : une ligne par pas, une colonne par couple (système, mode)
+    def __init__(self, path, names, modes):
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['time'] + [f"{name}|{mode}" for name in names for mode in modes])
+
+    def consume(self, chunk):
+        rows = np.column_stack([chunk.times, chunk.hits.reshape(-1, len(chunk.times)).T])
+        self._writer.writerows(rows.tolist())
+        return False
+
+    def close(self):
+        self._file.close()
+
+
+class LivePlot(Consumer):
+    # Hits cumulés d'un système, mis à jour à chaque bloc sans recréer la figure. La courbe est gardée dans un
+    # tampon de max_points échantillons : une fois plein, un échantillon sur deux est retiré et le pas
+    # d'échantillonnage doublé, la mémoire reste donc bornée quelle que soit la longueur du flux.
+    def __init__(self, names, modes, system, mode_labels=None, pause=0.001, max_points=2000):
+        import matplotlib.pyplot as plt
+
+        self._plt = plt
+        self.row = list(names).index(system)
+        self.pause = pause
+        self.fig, self.ax = plt.subplots(figsize=(10, 5))
+        self.ax.set_title(system)
+        self.ax.set_xlabel("Temps (s)")
+        self.ax.set_ylabel("Hits cumulés")
+        self.lines = [self.ax.plot([], [], label=(mode_labels or {}).get(mode, f"Mode {mode}"))[0] for mode in modes]
+        self.ax.legend()
+        self.max_points = max_points
+        self.stride = 1  # pas de la grille complète entre deux échantillons gardés
+        self.count = 0
+        self.times = np.empty(max_points)
+        self.cumulative = np.empty((len(modes), max_points))
+        self.totals = np.zeros(len(modes))
+
+    def _keep(self, start, times, cumulative, keep):
+        # Ajoute les échantillons keep du bloc, en décimant le tampon chaque fois qu'il est plein
+        while keep.size:
+            if self.count == self.max_points:
+                self.times[:self.count // 2] = self.times[1:self.count:2]
+                self.cumulative[:, :self.count // 2] = self.cumulative[:, 1:self.count:2]
+                self.count //= 2
+                self.stride *= 2
+                keep = keep[(keep + 1) % self.stride == 0]
+                continue
+            take = keep[:self.max_points - self.count]
+            self.times[self.count:self.count + take.size] = times[take - start]
+            self.cumulative[:, self.count:self.count + take.size] = cumulative[:, take - start]
+            self.count += take.size
+            keep = keep[take.size:]
+
+    def consume(self, chunk):
+        cumulative = self.totals[:, None] + np.cumsum(chunk.hits[self.row], axis=1)
+        self.totals = cumulative[:, -1]
+        # Échantillons gardés : indices de la grille complète k tels que (k + 1) soit multiple du pas
+        steps = chunk.start + np.arange(len(chunk.times))
+        self._keep(chunk.start, chunk.times, cumulative, steps[(steps + 1) % self.stride == 0])
+        for j, line in enumerate(self.lines):
+            # Dernier pas toujours affiché, même hors échantillonnage
+            line.set_data(np.append(self.times[:self.count], chunk.times[-1]),
+                          np.append(self.cumulative[j, :self.count], self.totals[j]))
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self._plt.pause(self.pause)
+        return False
+
+
+def run_pipeline(stream, consumers):
+    # Distribue chaque bloc à tous les consommateurs ; le flux s'arrête dès que l'un d'eux le demande.
+    # Retourne le nombre de pas lus.
+    steps = 0
+    try:
+        for chunk in stream:
+            steps += len(chunk.times)
+            stop = [consumer.consume(chunk) for consumer in consumers]
+            if any(stop):
+                break
+    finally:
+        # Un itérable quelconque (liste de blocs) n'a pas de close()
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+        for consumer in consumers:
+            consumer.close()
+    return steps
@@ -0,0 +1,287 @@
+"""Modèle physique : trajectoire du missile et réponse du CIWS."""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .numerique import normal_cdf, normal_cdf_scalar
+
+# À incrémenter à chaque changement des équations : invalide les résultats en cache
+MODEL_VERSION = 1
+
+# Paramètres de référence du missile simulé dans Visualisation.py
+EXOCET_MM40 = dict(
+    name="Exocet MM40", speed=300, surface=2.0, range=5000,
+    maneuver_g=5, zigzag_start=1000, zigzag_period=1000,
+    popup_time=2, popup_altitude=10, base_altitude=3, impact_altitude=3
+)
+
+
+class Missile:
+    def __init__(self, name, speed, surface, range, maneuver_g, zigzag_start, zigzag_period, popup_time, popup_altitude,
+                 base_altitude, impact_altitude):
+        self.name = name
+        self.speed = speed
+        self.surface = surface
+        self.range = range
+        self.maneuver_g = maneuver_g
+        self.zigzag_start = zigzag_start
+        self.zigzag_period = zigzag_period
+        self.popup_time = popup_time
+        self.popup_altitude = popup_altitude
+        self.base_altitude = base_altitude
+        self.impact_altitude = impact_altitude
+        self.amplitude = self.calculate_zigzag_amplitude()
+
+    def calculate_zigzag_amplitude(self):
+        T = self.zigzag_period / self.speed
+        return (self.maneuver_g * 9.81 * T ** 2) / (4 * np.pi ** 2)
+
+    def position(self, time, total_time, mode):
+        if time > total_time:
+            time = total_time
+        distance_covered = self.speed * time
+        distance = self.range - distance_covered
+
+        if mode == 1:  # Vol direct
+            y = 0
+        elif mode == 2:  # Vol manœuvrant (zigzag)
+            if distance <= self.zigzag_start:
+                distance_zigzag = self.zigzag_start - distance
+                y = self.amplitude * np.sin(2 * np.pi * distance_zigzag / self.zigzag_period)
+            else:
+                y = 0
+        elif mode == 3:  # Vol avec pop-up
+            y = 0
+        elif mode == 4:  # Vol combiné (zigzag + pop-up)
+            time_remaining = total_time - time
+            if time_remaining > self.popup_time:
+                if distance <= self.zigzag_start + (self.popup_time * self.speed):
+                    distance_zigzag = self.zigzag_start + (self.popup_time * self.speed) - distance
+                    y = self.amplitude * np.sin(2 * np.pi * distance_zigzag / self.zigzag_period)
+                else:
+                    y = 0
+            else:
+                y = 0
+
+        if mode in [1, 2]:  # Altitude constante
+            z = self.base_altitude
+        elif mode in [3, 4]:  # Pop-up
+            time_remaining = total_time - time
+            if time_remaining <= self.popup_time:
+                t_mid = self.popup_time / 2
+                z = (self.popup_altitude - self.impact_altitude) * (-4 / (self.popup_time ** 2)) * (
+                            time_remaining - t_mid) ** 2 + self.popup_altitude
+            else:
+                z = self.base_altitude
+        return distance, y, z
+
+    def positions(self, times, total_time, mode):
+        # Version vectorisée de position() : un tableau de temps -> tableaux x, y, z
+        times = np.minimum(np.asarray(times, dtype=float), total_time)
+        distance = self.range - self.speed * times
+        time_remaining = total_time - times
+
+        y = np.zeros_like(distance)
+        if mode == 2:  # Vol manœuvrant (zigzag)
+            zigzag = distance <= self.zigzag_start
+            distance_zigzag = self.zigzag_start - distance[zigzag]
+            y[zigzag] = self.amplitude * np.sin(2 * np.pi * distance_zigzag / self.zigzag_period)
+        elif mode == 4:  # Vol combiné (zigzag + pop-up)
+            zigzag = (time_remaining > self.popup_time) & (distance <= self.zigzag_start + (self.popup_time * self.speed))
+            distance_zigzag = self.zigzag_start + (self.popup_time * self.speed) - distance[zigzag]
+            y[zigzag] = self.amplitude * np.sin(2 * np.pi * distance_zigzag / self.zigzag_period)
+
+        z = np.full_like(distance, self.base_altitude)
+        if mode in [3, 4]:  # Pop-up
+            popup = time_remaining <= self.popup_time
+            t_mid = self.popup_time / 2
+            z[popup] = (self.popup_altitude - self.impact_altitude) * (-4 / (self.popup_time ** 2)) * (
+                        time_remaining[popup] - t_mid) ** 2 + self.popup_altitude
+        return distance, y, z
+
+
+class CIWS:
+    def __init__(self, name, fire_rate, projectile_speed, max_range, min_range, dispersion_angle, base_tracking_factor,
+                 kill_threshold, radar_local=True, eo_sensor=False, proximity_fuse=None, variable_rate=False):
+        self.name = name
+        self.fire_rate = fire_rate / 60  # RPM -> RPS
+        self.projectile_speed = projectile_speed
+        self.max_range = max_range
+        self.min_range = min_range
+        self.dispersion_angle = dispersion_angle
+        self.base_tracking_factor = base_tracking_factor
+        self.kill_threshold = kill_threshold
+        self.radar_local = radar_local
+        self.eo_sensor = eo_sensor
+        self.proximity_fuse = proximity_fuse
+        self.variable_rate = variable_rate
+        self._profiles = {}  # EngagementProfile déjà compilés, par (mode, brouillage)
+
+    def adjust_fire_rate(self, mode):
+        if self.variable_rate and mode in [3, 4]:  # Réduction pour pop-up ou combiné
+            return self.fire_rate * 0.5
+        return self.fire_rate
+
+    def dispersion_radius(self, distance):
+        return distance * np.tan(np.radians(self.dispersion_angle))
+
+    def adjust_tracking_factor(self, jamming_level):
+        tracking = self.base_tracking_factor
+        if self.radar_local:
+            tracking *= (1 - jamming_level * 0.2)
+        else:
+            tracking *= (1 - jamming_level * 0.4)
+        if self.eo_sensor:
+            tracking = min(self.base_tracking_factor,
+                           tracking + (self.base_tracking_factor - tracking) * 0.7 * (1 - jamming_level))
+        return max(0.1, tracking)
+
+    def compile(self, mode, jamming_level=0.2):
+        # Constantes de l'engagement pour un scénario (mode, brouillage), calculées une seule fois puis gardées :
+        # simulate_intercept() est appelé à chaque pas de temps. Les attributs ne doivent plus changer ensuite.
+        key = (mode, jamming_level)
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = self._profiles[key] = EngagementProfile.from_ciws(self, mode, jamming_level)
+        return profile
+
+    def simulate_intercept(self, time, missile_distance, missile, mode, dt, jamming_level=0.2):
+        return self.compile(mode, jamming_level).expected_hit(time, missile_distance, missile, dt)
+
+    def simulate_intercept_array(self, times, missile_distances, missile, mode, dt, jamming_level=0.2,
+                                 trajectory=None):
+        # Version vectorisée de simulate_intercept() : hits attendus pour chaque pas de temps en un seul appel
+        return self.compile(mode, jamming_level).expected_hits(times, missile_distances, missile, dt, trajectory)
+
+
+# Probabilité de toucher d'une fusée de proximité selon le type de fragmentation (scalaires ou tableaux)
+def _directional_hit_prob(explosion_radius, error_distance):
+    return np.minimum(1.0, 0.7 * explosion_radius / (error_distance + 0.1))
+
+
+def _guided_hit_prob(explosion_radius, error_distance):
+    return np.maximum(0, 0.95 - error_distance / (explosion_radius * 2))
+
+
+def _omnidirectional_hit_prob(explosion_radius, error_distance):
+    return np.minimum(1.0, 0.6 * explosion_radius / (error_distance + 0.1))
+
+
+FRAGMENT_HIT_PROBABILITY = {
+    'directional': _directional_hit_prob,
+    'guided': _guided_hit_prob,
+    'omnidirectional': _omnidirectional_hit_prob,
+}
+
+
+@dataclass(frozen=True)
+class EngagementProfile:
+    # Paramètres d'un CIWS résolus pour un mode de vol et un niveau de brouillage : plus de trigonométrie,
+    # de lecture de dictionnaire ni de choix de branche dans la boucle de simulation
+    name: str
+    mode: int
+    jamming_level: float
+    min_range: float
+    max_range: float
+    projectile_speed: float
+    tracking_factor: float
+    prediction_factor: float  # part de y et z retenue par la prédiction de tir
+    fire_rate: float  # obus/s après adjust_fire_rate(mode)
+    dispersion_tan: float  # tan(dispersion_angle) : rayon de dispersion = distance * dispersion_tan
+    rate_boost: bool  # cadence variable en pop-up : probabilité de toucher * 1,2
+    fuse: bool
+    explosion_radius: float = 0.0
+    fuse_area: float = 0.0
+    fragments: float = 0.0
+    hit_probability: object = None  # fonction (explosion_radius, error_distance) du type de fragmentation
+
+    @classmethod
+    def from_ciws(cls, ciws, mode, jamming_level=0.2):
+        tracking_factor = ciws.adjust_tracking_factor(jamming_level)
+        fuse = {}
+        if ciws.proximity_fuse:
+            explosion_radius = ciws.proximity_fuse['explosion_distance'] * np.tan(
+                np.radians(ciws.proximity_fuse['dispersion_angle'] / 2))
+            fuse = dict(fuse=True, explosion_radius=explosion_radius, fuse_area=np.pi * explosion_radius ** 2,
+                        fragments=ciws.proximity_fuse['fragments'],
+                        hit_probability=FRAGMENT_HIT_PROBABILITY[ciws.proximity_fuse['fragmentation_type']])
+        return cls(
+            name=ciws.name, mode=mode, jamming_level=jamming_level,
+            min_range=ciws.min_range, max_range=ciws.max_range, projectile_speed=ciws.projectile_speed,
+            tracking_factor=tracking_factor,
+            prediction_factor=0.8 if ciws.eo_sensor and mode != 1 else (1 - tracking_factor),
+            fire_rate=ciws.adjust_fire_rate(mode),
+            dispersion_tan=np.tan(np.radians(ciws.dispersion_angle)),
+            rate_boost=bool(ciws.variable_rate and mode in [3, 4]),
+            **(fuse or dict(fuse=False)))
+
+    def expected_hit(self, time, missile_distance, missile, dt):
+        # Hits attendus pendant un pas de temps (équivalent de CIWS.simulate_intercept)
+        if not self.min_range <= missile_distance <= self.max_range:
+            return 0
+        total_time = missile.range / missile.speed
+        flight_time = missile_distance / self.projectile_speed
+        x_curr, y_curr, z_curr = missile.position(time, total_time, self.mode)
+        x_real, y_real, z_real = missile.position(time + flight_time, total_time, self.mode)
+        x_pred = x_curr - missile.speed * flight_time
+        error_distance = np.sqrt((x_pred - x_real) ** 2 + (y_curr * self.prediction_factor - y_real) ** 2 +
+                                 (z_curr * self.prediction_factor - z_real) ** 2)
+        shots_fired = self.fire_rate * dt
+
+        if self.fuse:
+            hit_prob = self.hit_probability(self.explosion_radius, error_distance)
+            if self.rate_boost:
+                hit_prob = min(1.0, hit_prob * 1.2)
+            shot_density = (self.fragments * shots_fired) / self.fuse_area
+            return min(shot_density * missile.surface * hit_prob, shots_fired * self.fragments * 0.05)
+
+        radius = missile_distance * self.dispersion_tan
+        dispersion_area = np.pi * radius ** 2 * (1 - self.tracking_factor)
+        shot_density = shots_fired / max(dispersion_area, missile.surface)
+        hit_prob = normal_cdf_scalar(radius, error_distance, radius / 4) if self.mode != 1 else 0.95
+        if self.rate_boost:
+            hit_prob = min(1.0, hit_prob * 1.2)
+        return min(shot_density * missile.surface * hit_prob * 2, shots_fired * 1.5)
+
+    def expected_hits(self, times, missile_distances, missile, dt, trajectory=None):
+        # Version vectorisée de expected_hit() sur un tableau de pas de temps. trajectory : fonction
+        # instants -> (x, y, z) remplaçant Missile.positions, ex. une trajectoires.TrajectoryTable
+        times = np.asarray(times, dtype=float)
+        missile_distances = np.asarray(missile_distances, dtype=float)
+        expected_hits = np.zeros_like(missile_distances)
+        engaged = (self.min_range <= missile_distances) & (missile_distances <= self.max_range)
+        if not engaged.any():
+            return expected_hits
+
+        total_time = missile.range / missile.speed
+        distance = missile_distances[engaged]
+        flight_time = distance / self.projectile_speed
+        if trajectory is None:
+            trajectory = lambda t: missile.positions(t, total_time, self.mode)
+        x_curr, y_curr, z_curr = trajectory(times[engaged])
+        x_real, y_real, z_real = trajectory(times[engaged] + flight_time)
+        x_pred = x_curr - missile.speed * flight_time
+        error_distance = np.sqrt((x_pred - x_real) ** 2 + (y_curr * self.prediction_factor - y_real) ** 2 +
+                                 (z_curr * self.prediction_factor - z_real) ** 2)
+        shots_fired = self.fire_rate * dt
+
+        if self.fuse:
+            hit_prob = self.hit_probability(self.explosion_radius, error_distance)
+            if self.rate_boost:
+                hit_prob = np.minimum(1.0, hit_prob * 1.2)
+            shot_density = (self.fragments * shots_fired) / self.fuse_area
+            hits = np.minimum(shot_density * missile.surface * hit_prob, shots_fired * self.fragments * 0.05)
+        else:
+            radius = distance * self.dispersion_tan
+            dispersion_area = np.pi * radius ** 2 * (1 - self.tracking_factor)
+            shot_density = shots_fired / np.maximum(dispersion_area, missile.surface)
+            if self.mode != 1:
+                hit_prob = normal_cdf(radius, error_distance, radius / 4)
+            else:
+                hit_prob = np.full_like(distance, 0.95)
+            if self.rate_boost:
+                hit_prob = np.minimum(1.0, hit_prob * 1.2)
+            hits = np.minimum(shot_density * missile.surface * hit_prob * 2, shots_fired * 1.5)
+
+        expected_hits[engaged] = hits
+        return expected_hits
@@ -0,0 +1,228 @@
+"""Évaluation de tout le catalogue CIWS en un seul calcul vectorisé (système × mode × temps)."""
+import numpy as np
+
+from .numerique import normal_cdf
+from .profilage import counted, phase
+
+# Codes entiers des types de fragmentation (0 = pas de fusée de proximité)
+FRAGMENTATION_TYPES = {'directional': 1, 'guided': 2, 'omnidirectional': 3}
+
+
+def stack_catalog(ciws_systems):
+    # Empile les paramètres des objets CIWS en colonnes NumPy (une ligne par système)
+    fuses = [ciws.proximity_fuse or {} for ciws in ciws_systems]
+    return {
+        'name': np.array([ciws.name for ciws in ciws_systems], dtype=object),
+        'fire_rate': np.array([ciws.fire_rate for ciws in ciws_systems], dtype=float),  # obus/s
+        'fire_rate_rpm': np.array([ciws.fire_rate * 60 for ciws in ciws_systems], dtype=float),
+        'projectile_speed': np.array([ciws.projectile_speed for ciws in ciws_systems], dtype=float),
+        'max_range': np.array([ciws.max_range for ciws in ciws_systems], dtype=float),
+        'min_range': np.array([ciws.min_range for ciws in ciws_systems], dtype=float),
+        'dispersion_angle': np.array([ciws.dispersion_angle for ciws in ciws_systems], dtype=float),
+        'base_tracking_factor': np.array([ciws.base_tracking_factor for ciws in ciws_systems], dtype=float),
+        'kill_threshold': np.array([ciws.kill_threshold for ciws in ciws_systems], dtype=float),
+        'radar_local': np.array([ciws.radar_local for ciws in ciws_systems], dtype=bool),
+        'eo_sensor': np.array([ciws.eo_sensor for ciws in ciws_systems], dtype=bool),
+        'variable_rate': np.array([ciws.variable_rate for ciws in ciws_systems], dtype=bool),
+        'explosion_distance': np.array([f.get('explosion_distance', 0) for f in fuses], dtype=float),
+        'fuse_dispersion_angle': np.array([f.get('dispersion_angle', 0) for f in fuses], dtype=float),
+        'fragments': np.array([f.get('fragments', 0) for f in fuses], dtype=float),
+        'fragmentation_type': np.array([FRAGMENTATION_TYPES.get(f.get('fragmentation_type'), 0) for f in fuses],
+                                       dtype=np.int8),
+    }
+
+
+def tracking_factors(catalog, jamming_level):
+    # Équivalent vectorisé de CIWS.adjust_tracking_factor
+    base = catalog['base_tracking_factor']
+    tracking = base * np.where(catalog['radar_local'], 1 - jamming_level * 0.2, 1 - jamming_level * 0.4)
+    eo_tracking = np.minimum(base, tracking + (base - tracking) * 0.7 * (1 - jamming_level))
+    tracking = np.where(catalog['eo_sensor'], eo_tracking, tracking)
+    return np.maximum(0.1, tracking)
+
+
+def impact_step(missile, time_array):
+    # Indice du premier pas où le missile atteint le navire (fin de la simulation)
+    impact_steps = np.flatnonzero(missile.range - missile.speed * time_array <= 0)
+    return impact_steps[0] if impact_steps.size else len(time_array)
+
+
+@counted()
+def evaluate_mode(missile, catalog, mode, time_array, dt, jamming_level=0.2, trajectory=None, cache=None):
+    # Hits attendus par pas pour tous les systèmes dans un mode de vol : tableau (système, temps).
+    # jamming_level peut être un tableau 1D de niveaux : tableau (système, brouillage, temps) en une passe. Seul le
+    # facteur de poursuite dépend du brouillage ; trajectoires et géométrie sont calculées une fois et diffusées.
+    # Avec un TrajectoryCache, la trajectoire vient du cache et la position à l'arrivée des projectiles
+    # est interpolée au lieu d'être recalculée.
+    total_time = missile.range / missile.speed
+    n_steps = impact_step(missile, time_array)
+    times = np.asarray(time_array, dtype=float)[:n_steps]
+    with phase('trajectoires'):
+        if cache is not None:
+            trajectory = cache.get(missile, mode, time_array)
+        elif trajectory is None:
+            trajectory = missile.positions(times, total_time, mode)
+        x_curr, y_curr, z_curr = (np.asarray(c)[:n_steps] for c in trajectory)
+    # Trajectoire et position à l'arrivée des projectiles d'un côté, calcul d'interception de l'autre
+    with phase('interception'):
+        levels = np.asarray(jamming_level, dtype=float)
+        if levels.ndim > 1:
+            raise ValueError("jamming_level doit être un scalaire ou un tableau 1D")
+        # Axe du brouillage en tête pendant le calcul, (système, brouillage, temps) au retour
+        hits = np.zeros(levels.shape + (len(catalog['name']), len(time_array)))
+        engaged = (catalog['min_range'][:, None] <= x_curr) & (x_curr <= catalog['max_range'][:, None])
+        rows, steps = np.nonzero(engaged)
+        if rows.size == 0:
+            return np.moveaxis(hits, 0, 1) if levels.ndim else hits
+
+        # Tous les couples (système, pas) engagés sont traités comme un seul vecteur
+        distance = x_curr[steps]
+        flight_time = distance / catalog['projectile_speed'][rows]
+        tracking_factor = tracking_factors(catalog, levels[..., None])[..., rows]
+        eo_sensor = catalog['eo_sensor'][rows]
+        prediction = np.where(eo_sensor & (mode != 1), 0.8, 1 - tracking_factor)
+        x_pred = x_curr[steps] - missile.speed * flight_time
+        y_pred = y_curr[steps] * prediction
+        z_pred = z_curr[steps] * prediction
+    with phase('trajectoires'):
+        if cache is not None:
+            x_real, y_real, z_real = cache.at(missile, mode, time_array, times[steps] + flight_time)
+        else:
+            x_real, y_real, z_real = missile.positions(times[steps] + flight_time, total_time, mode)
+    with phase('interception'):
+        error_distance = np.sqrt((x_pred - x_real) ** 2 + (y_pred - y_real) ** 2 + (z_pred - z_real) ** 2)
+
+        radius = distance * np.tan(np.radians(catalog['dispersion_angle'][rows]))
+        variable_rate = catalog['variable_rate'][rows] & (mode in [3, 4])
+        shots_fired = np.where(variable_rate, catalog['fire_rate'][rows] * 0.5, catalog['fire_rate'][rows]) * dt
+        fragmentation_type = catalog['fragmentation_type'][rows]
+        expected_hits = np.empty(levels.shape + distance.shape)
+
+        # Branche fusée de proximité (fragments)
+        fuse = fragmentation_type > 0
+        if fuse.any():
+            fragments = catalog['fragments'][rows[fuse]]
+            explosion_radius = catalog['explosion_distance'][rows[fuse]] * np.tan(
+                np.radians(catalog['fuse_dispersion_angle'][rows[fuse]] / 2))
+            dispersion_area = np.pi * explosion_radius ** 2
+            shot_density = (fragments * shots_fired[fuse]) / dispersion_area
+            error = error_distance[..., fuse]
+            hit_prob = np.select(
+                [fragmentation_type[fuse] == FRAGMENTATION_TYPES['directional'],
+                 fragmentation_type[fuse] == FRAGMENTATION_TYPES['guided']],
+                [np.minimum(1.0, 0.7 * explosion_radius / (error + 0.1)),
+                 np.maximum(0, 0.95 - error / (explosion_radius * 2))],
+                np.minimum(1.0, 0.6 * explosion_radius / (error + 0.1)))
+            hit_prob = np.where(variable_rate[fuse], np.minimum(1.0, hit_prob * 1.2), hit_prob)
+            expected_hits[..., fuse] = np.minimum(shot_density * missile.surface * hit_prob,
+                                                  shots_fired[fuse] * fragments * 0.05)
+
+        # Branche cinétique (obus)
+        kinetic = ~fuse
+        if kinetic.any():
+            r = radius[kinetic]
+            dispersion_area = np.pi * r ** 2 * (1 - tracking_factor[..., kinetic])
+            shot_density = shots_fired[kinetic] / np.maximum(dispersion_area, missile.surface)
+            if mode != 1:
+                hit_prob = normal_cdf(r, error_distance[..., kinetic], r / 4)
+            else:
+                hit_prob = np.full_like(r, 0.95)
+            hit_prob = np.where(variable_rate[kinetic], np.minimum(1.0, hit_prob * 1.2), hit_prob)
+            expected_hits[..., kinetic] = np.minimum(shot_density * missile.surface * hit_prob * 2,
+                                                     shots_fired[kinetic] * 1.5)
+
+    hits[..., rows, steps] = expected_hits
+    return np.moveaxis(hits, 0, 1) if levels.ndim else hits
+
+
+@counted()
+def evaluate_catalog(missile, catalog, modes, time_array, dt, jamming_level=0.2, trajectories=None, cache=None):
+    # Tenseur des hits attendus par pas : (système, mode, temps), (système, mode, brouillage, temps) si
+    # jamming_level est un tableau de niveaux
+    trajectories = trajectories or {}
+    return np.stack([evaluate_mode(missile, catalog, mode, time_array, dt, jamming_level, trajectories.get(mode), cache)
+                     for mode in modes], axis=1)
+
+
+@counted()
+def evaluate_until_kill(missile, catalog, modes, time_array, dt, jamming_level=0.2, chunk_size=500):
+    # Évaluation par blocs de pas : un couple (système, mode) n'est plus évalué une fois son seuil de destruction
+    # atteint. Retourne des tableaux (système, mode) : hits cumulés jusqu'à l'arrêt, instant et distance du missile
+    # à la neutralisation (NaN si jamais), cadence maximale (hits/s), nombre de pas réellement calculés (blocs
+    # entiers, steps) et nombre de pas jusqu'à la neutralisation ou l'impact (steps_to_kill).
+    time_array = np.asarray(time_array, dtype=float)
+    n_steps = impact_step(missile, time_array)
+    columns = getattr(catalog, 'columns', catalog)
+    kill_threshold = np.asarray(columns['kill_threshold'], dtype=float)
+    shape = (len(kill_threshold), len(modes))
+    totals, peak = np.zeros(shape), np.zeros(shape)
+    steps, steps_to_kill = np.zeros(shape, dtype=int), np.zeros(shape, dtype=int)
+    time_to_kill = np.full(shape, np.nan)
+
+    for j, mode in enumerate(modes):
+        active = np.arange(len(kill_threshold))
+        for start in range(0, n_steps, chunk_size):
+            if not active.size:
+                break
+            times = time_array[start:min(start + chunk_size, n_steps)]
+            hits = evaluate_mode(missile, {key: values[active] for key, values in columns.items()}, mode, times, dt,
+                                 jamming_level)
+            cumulative = totals[active, j][:, None] + np.cumsum(hits, axis=1)
+            reached = cumulative >= kill_threshold[active, None]
+            killed = reached.any(axis=1)
+            last = np.where(killed, reached.argmax(axis=1), len(times) - 1)
+
+            # Seuls les pas jusqu'à la neutralisation comptent
+            totals[active, j] = cumulative[np.arange(active.size), last]
+            evaluated = np.arange(len(times)) <= last[:, None]
+            peak[active, j] = np.maximum(peak[active, j], np.where(evaluated, hits, 0).max(axis=1))
+            steps[active, j] += len(times)
+            steps_to_kill[active, j] += last + 1
+            time_to_kill[active[killed], j] = times[last[killed]]
+            active = active[~killed]
+
+    return {
+        'hits': totals,
+        'time_to_kill': time_to_kill,
+        'range_at_kill': missile.range - missile.speed * time_to_kill,
+        'peak_rate': peak / dt,
+        'steps': steps,
+        'steps_to_kill': steps_to_kill,
+    }
+
+
+def result_trajectory(missile, mode, time_array, trajectory=None):
+    # Trajectoire telle qu'exposée dans les résultats : figée au point d'impact, nulle au-delà
+    total_time = missile.range / missile.speed
+    n_steps = impact_step(missile, time_array)
+    x_traj, y_traj, z_traj = trajectory if trajectory is not None else missile.positions(time_array, total_time, mode)
+    x_pos = missile.range - missile.speed * time_array
+    x_pos[:n_steps] = x_traj[:n_steps]
+    x_pos[n_steps:n_steps + 1] = 0
+    y_pos = np.zeros_like(time_array)
+    z_pos = np.zeros_like(time_array)
+    y_pos[:n_steps + 1] = y_traj[:n_steps + 1]
+    z_pos[:n_steps + 1] = z_traj[:n_steps + 1]
+    return x_pos, y_pos, z_pos
+
+
+@counted()
+def build_results(missile, catalog, modes, time_array, dt, hits, trajectories=None, cache=None):
+    # Remet le tenseur sous la forme results[nom][mode] utilisée par les scripts
+    n_steps = impact_step(missile, time_array)
+    cumulative = np.cumsum(hits, axis=2)
+    cumulative[:, :, n_steps:] = 0
+    results = {name: {} for name in catalog['name']}
+    for j, mode in enumerate(modes):
+        if cache is not None:
+            trajectory = cache.get(missile, mode, time_array)
+        else:
+            trajectory = (trajectories or {}).get(mode)
+        x_pos, y_pos, z_pos = result_trajectory(missile, mode, time_array, trajectory)
+        for i, name in enumerate(catalog['name']):
+            results[name][mode] = {
+                'x': x_pos, 'y': y_pos, 'z': z_pos,
+                'hits': cumulative[i, j, n_steps - 1] if n_steps else 0,
+                'hits_per_sec': hits[i, j] / dt, 'cumulative_hits': cumulative[i, j]
+            }
+    return results
@@ -0,0 +1,89 @@
+"""Fonctions numériques du noyau d'engagement : loi normale sans le coût d'appel de scipy.stats.
+
+Vérification : python -m simulateur.numerique
+"""
+import math
+import sys
+
+import numpy as np
+
+SQRT_HALF = math.sqrt(0.5)
+# Écarts maximaux tolérés avec scipy.stats.norm.cdf : absolu, et relatif dans la queue basse (1e-300 < CDF < 1e-3),
+# où l'arrondi de la variable réduite z amplifie l'erreur relative d'environ z² * epsilon (~3e-13 à z = -38)
+CDF_TOLERANCE = 1e-14
+TAIL_TOLERANCE = 1e-11
+
+_erfc_ufunc = np.frompyfunc(math.erfc, 1, 1)
+_ndtr = None  # implémentation de normal_cdf, résolue au premier appel (voir _resolve_ndtr)
+
+
+def _erfc_ndtr(z):
+    # Repli sans scipy : math.erfc élément par élément (même précision que le chemin scalaire, mais bien plus lent)
+    return 0.5 * np.asarray(_erfc_ufunc(-np.asarray(z) * SQRT_HALF), dtype=float)
+
+
+def _resolve_ndtr():
+    # ndtr de scipy.special si disponible, sinon _erfc_ndtr. scipy.special (~0,2 s) n'est importé qu'au
+    # premier appel de normal_cdf pour garder l'import du modèle léger ; le choix est ensuite gardé.
+    global _ndtr
+    try:
+        from scipy.special import ndtr
+    except ImportError:
+        ndtr = _erfc_ndtr
+    _ndtr = ndtr
+    return ndtr
+
+
+def normal_cdf(x, loc, scale):
+    # Tableaux : même calcul que norm.cdf (ndtr de la variable centrée réduite), sans validation des
+    # paramètres ni gestion de distribution figée. scale doit être > 0.
+    ndtr = _ndtr or _resolve_ndtr()
+    return ndtr((np.asarray(x, dtype=float) - loc) / scale)
+
+
+def normal_cdf_scalar(x, loc, scale):
+    # Scalaire : math.erfc évite le coût fixe d'un appel de ufunc dans la boucle pas à pas. scale doit être > 0.
+    return 0.5 * math.erfc((loc - x) / scale * SQRT_HALF)
+
+
+def check_normal_cdf(samples=100000, seed=0, tolerance=CDF_TOLERANCE, tail_tolerance=TAIL_TOLERANCE):
+    # Compare les deux chemins à scipy.stats.norm.cdf sur des tirages couvrant le domaine du noyau cinétique
+    # (rayon de dispersion de 1 cm à 50 m, écart de visée jusqu'à 200 m) et des variables réduites dans [-40, 40].
+    from scipy.stats import norm
+
+    rng = np.random.default_rng(seed)
+    radius = 10 ** rng.uniform(-2, np.log10(50), samples)
+    error_distance = np.concatenate([rng.uniform(0, 200, samples // 2),
+                                     radius[samples // 2:] * rng.uniform(-9, 11, samples - samples // 2)])
+    x, loc, scale = radius, error_distance, radius / 4
+    reduced = np.linspace(-40, 40, 8001)
+    x = np.concatenate([x, reduced])
+    loc = np.concatenate([loc, np.zeros_like(reduced)])
+    scale = np.concatenate([scale, np.ones_like(reduced)])
+
+    reference = norm.cdf(x, loc=loc, scale=scale)
+    fast = normal_cdf(x, loc, scale)
+    scalar = np.array([normal_cdf_scalar(*args) for args in zip(x.tolist(), loc.tolist(), scale.tolist())])
+
+    tail = (reference > 1e-300) & (reference < 1e-3)
+    errors = {}
+    for name, values in (('array', fast), ('scalar', scalar)):
+        errors[name] = {
+            'absolute': float(np.max(np.abs(values - reference))),
+            'relative_tail': float(np.max(np.abs(values[tail] - reference[tail]) / reference[tail])),
+        }
+    ok = all(result['absolute'] <= tolerance and result['relative_tail'] <= tail_tolerance
+             for result in errors.values())
+    return ok, errors
+
+
+def main():
+    ok, errors = check_normal_cdf()
+    for name, result in errors.items():
+        print(f"{name:<7} | écart absolu {result['absolute']:.2e} | écart relatif (queue) {result['relative_tail']:.2e}")
+    print(f"Tolérances {CDF_TOLERANCE:.0e} / {TAIL_TOLERANCE:.0e} : {'OK' if ok else 'ÉCHEC'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""Instrumentation intégrée : chronomètres de phase, compteurs d'appels et profil cProfile optionnel.
+
+Désactivée par défaut : phase() retourne un contexte vide partagé et les fonctions décorées par counted() ne
+font qu'un test de drapeau avant l'appel direct, soit quelques centaines de nanosecondes par appel (mesure :
+python -m simulateur.profilage). Seules des fonctions appelées quelques fois par scénario sont instrumentées.
+Activation : enable(), l'option --profile de python -m simulateur, ou la variable d'environnement
+CIWS_PROFILE=1 (CIWS_PROFILE=fichier.pstats enregistre en plus un profil cProfile).
+"""
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+_NULL_PHASE = nullcontext()
+
+
+class Profiler:
+    # Temps cumulés par phase nommée et (appels, temps) par fonction ; les mesures de threads concurrents
+    # (Simulation.run_many) sont regroupées sous un verrou
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.calls = {}
+        self.profile_path = None
+        self._profile = None
+        self._start = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.phases.clear()
+            self.calls.clear()
+        self._start = time.perf_counter()
+
+    def enable(self, profile_path=None):
+        self.reset()
+        self.enabled = True
+        self.profile_path = profile_path
+        if profile_path:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def disable(self):
+        # Arrête les mesures et enregistre le profil cProfile éventuel ; retourne son chemin
+        self.enabled = False
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        self._profile.dump_stats(self.profile_path)
+        self._profile = None
+        return self.profile_path
+
+    def _record(self, table, name, elapsed):
+        with self._lock:
+            entry = table.get(name)
+            if entry is None:
+                table[name] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _NULL_PHASE
+
+    def counted(self, name=None):
+        def decorator(func):
+            label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._record(self.calls, label, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def report(self, stream=None):
+        # Tableau récapitulatif : phases puis fonctions, triées par temps cumulé, en part du temps écoulé
+        # depuis enable(). Les phases imbriquées sont comptées dans leur phase parente.
+        stream = stream or sys.stdout
+        wall = time.perf_counter() - self._start if self._start is not None else 0.0
+        for title, table in (("Phase", self.phases), ("Fonction", self.calls)):
+            if not table:
+                continue
+            print(f"\n{title:<36} | {'Appels':>8} | {'Total':>10} | {'Moyenne':>10} | {'Part':>6}", file=stream)
+            print("-" * 82, file=stream)
+            for name, (count, total) in sorted(table.items(), key=lambda item: -item[1][1]):
+                share = f"{total / wall:.0%}" if wall else '-'
+                print(f"{name:<36} | {count:>8} | {format_time(total):>10} | {format_time(total / count):>10} | "
+                      f"{share:>6}", file=stream)
+        if wall:
+            print(f"\nTemps écoulé : {format_time(wall)}", file=stream)
+        if self.profile_path:
+            print(f"Profil cProfile : {self.profile_path} (python -m pstats {self.profile_path})", file=stream)
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.profiler.phases, self.name, time.perf_counter() - self.start)
+        return False
+
+
+def format_time(seconds):
+    # Durée lisible (s, ms, µs ou ns), partagée avec le banc de mesure
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+# Instance partagée par les modules du simulateur
+PROFILER = Profiler()
+phase = PROFILER.phase
+counted = PROFILER.counted
+
+
+def enable(profile_path=None):
+    PROFILER.enable(profile_path)
+
+
+def finish(stream=None):
+    # Fin d'exécution : arrête les mesures et affiche le récapitulatif ; sans effet si désactivé
+    if not PROFILER.enabled:
+        return
+    PROFILER.disable()
+    PROFILER.report(stream)
+
+
+def check_overhead(calls=200_000):
+    # Coût par appel d'une fonction décorée et d'une phase, instrumentation désactivée puis activée
+    def plain():
+        pass
+
+    decorated = counted('overhead')(plain)
+    was_enabled = PROFILER.enabled
+    costs = {}
+    for enabled in (False, True):
+        PROFILER.enabled = enabled
+        for label, call in (('appel', plain), ('appel compté', decorated)):
+            start = time.perf_counter()
+            for _ in range(calls):
+                call()
+            costs[(label, enabled)] = (time.perf_counter() - start) / calls
+        start = time.perf_counter()
+        for _ in range(calls):
+            with phase('overhead'):
+                pass
+        costs[('phase', enabled)] = (time.perf_counter() - start) / calls
+    PROFILER.enabled = was_enabled
+    PROFILER.phases.pop('overhead', None)
+    PROFILER.calls.pop('overhead', None)
+    return costs
+
+
+def main():
+    costs = check_overhead()
+    print(f"{'Mesure':<14} | {'Désactivé':>10} | {'Activé':>10}")
+    print("-" * 40)
+    for label in ('appel', 'appel compté', 'phase'):
+        print(f"{label:<14} | {format_time(costs[(label, False)]):>10} | {format_time(costs[(label, True)]):>10}")
+    return 0
+
+
+# Processus principal seulement : les processus de rendu ou de balayage (spawn) réimportent ce module et
+# afficheraient chacun leur récapitulatif en écrasant le même fichier .pstats
+def _main_process():
+    import multiprocessing
+
+    return multiprocessing.parent_process() is None
+
+
+_environment = os.environ.get('CIWS_PROFILE')
+if _environment and _main_process():
+    enable(None if _environment == '1' else _environment)
+    atexit.register(finish)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Total de hits par quadrature : forme fermée pour le vol direct, Gauss-Kronrod adaptatif pour les autres modes."""
+import numpy as np
+
+from .adaptatif import engagement_breakpoints, hit_rate
+
+# Règle de Gauss-Kronrod 7-15 (QUADPACK) sur [-1, 1] : nœuds positifs, poids de Kronrod et de Gauss
+_XGK = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                 0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                 0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                 0.207784955007898467600689403773245, 0.000000000000000000000000000000000])
+_WGK = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                 0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                 0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                 0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_WG = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+NODES = np.concatenate([-_XGK[:-1], _XGK[::-1]])
+KRONROD_WEIGHTS = np.concatenate([_WGK[:-1], _WGK[::-1]])
+GAUSS_WEIGHTS = np.zeros(15)
+GAUSS_WEIGHTS[[1, 3, 5, 7, 9, 11, 13]] = np.concatenate([_WG[:-1], _WG[::-1]])
+
+
+def direct_flight_hits(missile, ciws, jamming_level=0.2):
+    # Vol direct (mode 1) : y = 0 et z constant, l'intégrande ne dépend que de la distance d = range - speed * t
+    d_lo = max(ciws.min_range, 0.0)
+    d_hi = min(ciws.max_range, missile.range)
+    if d_hi <= d_lo:
+        return 0.0
+    profile = ciws.compile(1, jamming_level)
+    rate = profile.fire_rate
+
+    if profile.fuse:
+        # Erreur de prédiction constante : seule l'altitude est mal estimée, de base_altitude * tracking_factor
+        error_distance = abs(missile.base_altitude * profile.prediction_factor - missile.base_altitude)
+        hit_prob = profile.hit_probability(profile.explosion_radius, error_distance)
+        shot_density = profile.fragments * rate / profile.fuse_area
+        hits_per_sec = min(shot_density * missile.surface * hit_prob, rate * profile.fragments * 0.05)
+        return hits_per_sec * (d_hi - d_lo) / missile.speed
+
+    # Cinétique : plafond 1,5 * cadence tant que la dispersion reste petite, puis décroissance en 1 / d²
+    area_factor = np.pi * profile.dispersion_tan ** 2 * (1 - profile.tracking_factor)
+    coefficient = 1.9 * rate * missile.surface / area_factor if area_factor > 0 else np.inf
+    d_cap = np.sqrt(coefficient / (1.5 * rate)) if area_factor > 0 else np.inf
+    capped = max(0.0, min(d_hi, d_cap) - d_lo) * 1.5 * rate
+    tail_lo = max(d_lo, d_cap)
+    tail = coefficient * (1 / tail_lo - 1 / d_hi) if tail_lo < d_hi else 0.0
+    return (capped + tail) / missile.speed
+
+
+def gauss_kronrod(f, breakpoints, tol=1e-6, max_intervals=100000, max_depth=40):
+    # Gauss-Kronrod 7-15 adaptatif, vectorisé sur tous les intervalles actifs.
+    # Retourne (intégrale, borne d'erreur) ; f reçoit un tableau de temps.
+    # Un intervalle coupé max_depth fois (discontinuité intérieure, bruit d'arrondi) est accepté tel quel :
+    # son erreur estimée |Kronrod - Gauss| est ajoutée à la borne retournée au lieu de le subdiviser sans fin.
+    a, b = np.asarray(breakpoints[:-1], dtype=float), np.asarray(breakpoints[1:], dtype=float)
+    interval_tol = tol * (b - a) / (breakpoints[-1] - breakpoints[0])
+    depth = np.zeros(a.size, dtype=int)
+    total, error = 0.0, 0.0
+    while a.size:
+        center, half = (a + b) / 2, (b - a) / 2
+        values = f((center[:, None] + half[:, None] * NODES).ravel()).reshape(a.size, 15)
+        kronrod = half * (values @ KRONROD_WEIGHTS)
+        gauss = half * (values @ GAUSS_WEIGHTS)
+        err = np.abs(kronrod - gauss)
+        done = (err <= interval_tol) | (depth >= max_depth) | (a.size > max_intervals)
+        total += kronrod[done].sum()
+        error += err[done].sum()
+
+        keep = ~done
+        a, b = np.concatenate([a[keep], center[keep]]), np.concatenate([center[keep], b[keep]])
+        interval_tol = np.concatenate([interval_tol[keep], interval_tol[keep]]) / 2
+        depth = np.concatenate([depth[keep], depth[keep]]) + 1
+    return total, error
+
+
+def quadrature_engagement(missile, ciws, mode, jamming_level=0.2, tol=1e-6):
+    # Total de hits (limite dt -> 0) et borne d'erreur pour un système et un mode
+    if mode == 1:
+        return direct_flight_hits(missile, ciws, jamming_level), 0.0
+    breakpoints = engagement_breakpoints(missile, ciws, mode)
+    if len(breakpoints) < 2:
+        return 0.0, 0.0
+
+    # Les nœuds de Gauss-Kronrod sont intérieurs aux intervalles : pas d'évaluation sur une discontinuité
+    profile = ciws.compile(mode, jamming_level)
+    return gauss_kronrod(lambda t: hit_rate(missile, profile, t), breakpoints, tol)
+
+
+def quadrature_catalog(missile, catalogue, modes, jamming_level=0.2, tol=1e-6):
+    # Un appel d'intégrateur par cellule (système, mode)
+    hits = np.zeros((len(catalogue), len(modes)))
+    errors = np.zeros_like(hits)
+    for i, ciws in enumerate(catalogue.systems()):
+        for j, mode in enumerate(modes):
+            hits[i, j], errors[i, j] = quadrature_engagement(missile, ciws, mode, jamming_level, tol)
+    return hits, errors
@@ -0,0 +1,158 @@
+"""Recalcul incrémental : seules les cellules (système, mode) dont une dépendance a changé sont réévaluées.
+
+Dépendances d'une cellule : la ligne du système dans le catalogue (hors nom et seuil de destruction, qui ne
+changent que les résumés), le mode, et le scénario (missile, dt, brouillage) qui concerne toutes les cellules.
+Le mode surveillance (watch) relance la mise à jour à chaque modification du fichier catalogue.
+Vérification : python -m simulateur.recalcul
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from .catalogue import CATALOGUE_FILE, FUSES_FILE, Catalogue
+from .moteur import evaluate_mode
+from .resultats import ResultStore
+from .simulation import Scenario
+from .trajectoires import TrajectoryCache
+
+# Colonnes sans effet sur les hits par pas : leur changement ne recalcule que les résumés
+SUMMARY_COLUMNS = ('name', 'kill_threshold')
+
+
+def row_fingerprints(catalogue):
+    # Empreinte de chaque ligne : valeurs des colonnes qui entrent dans le calcul des hits, {nom: tuple}
+    columns = [column for column in sorted(catalogue.columns) if column not in SUMMARY_COLUMNS]
+    values = zip(*(catalogue[column].tolist() for column in columns))
+    return dict(zip(catalogue['name'], values))
+
+
+def scenario_fingerprint(scenario):
+    return tuple(sorted(scenario.missile.items())), float(scenario.dt), float(scenario.jamming_level)
+
+
+class IncrementalSimulation:
+    # Garde le tenseur de hits de la dernière mise à jour et les empreintes dont il dépend ; update() ne
+    # réévalue que les cellules modifiées et retourne un ResultStore complet.
+    def __init__(self, scenario=None, catalogue=None, trajectories=None):
+        self.scenario = scenario if scenario is not None else Scenario()
+        self.catalogue = catalogue if catalogue is not None else Catalogue.from_csv()
+        self.trajectories = trajectories if trajectories is not None else TrajectoryCache()
+        self.results = None
+        self.recomputed = []  # cellules (nom, mode) réévaluées par la dernière mise à jour
+        self._hits = {}  # (nom, mode) -> hits par pas
+        self._rows = {}
+        self._scenario_key = None
+
+    def dirty_cells(self, scenario, catalogue):
+        # Cellules à réévaluer pour passer de l'état courant à (scenario, catalogue)
+        rows = row_fingerprints(catalogue)
+        same_scenario = scenario_fingerprint(scenario) == self._scenario_key
+        return [(name, mode) for name in catalogue['name'] for mode in scenario.modes
+                if not same_scenario or self._rows.get(name) != rows[name] or (name, mode) not in self._hits]
+
+    def update(self, scenario=None, catalogue=None):
+        scenario = scenario if scenario is not None else self.scenario
+        catalogue = catalogue if catalogue is not None else self.catalogue
+        dirty = self.dirty_cells(scenario, catalogue)
+        missile = scenario.build_missile()
+        time_array = scenario.time_array()
+
+        # Une évaluation par mode, limitée aux systèmes dont la cellule est à recalculer
+        for mode in scenario.modes:
+            names = [name for name, dirty_mode in dirty if dirty_mode == mode]
+            if not names:
+                continue
+            hits = evaluate_mode(missile, catalogue.subset(names), mode, time_array, scenario.dt,
+                                 scenario.jamming_level, cache=self.trajectories)
+            for name, row in zip(names, hits):
+                self._hits[(name, mode)] = row
+
+        # Les cellules des systèmes retirés du catalogue ou des modes abandonnés sont oubliées
+        names = list(catalogue['name'])
+        self._hits = {(name, mode): self._hits[(name, mode)] for name in names for mode in scenario.modes}
+        self._rows = row_fingerprints(catalogue)
+        self._scenario_key = scenario_fingerprint(scenario)
+        self.scenario, self.catalogue, self.recomputed = scenario, catalogue, dirty
+
+        hits = np.array([[self._hits[(name, mode)] for mode in scenario.modes] for name in names])
+        self.results = ResultStore.from_hits(missile, catalogue, scenario.modes, time_array, scenario.dt, hits,
+                                             cache=self.trajectories)
+        return self.results
+
+
+def _mtimes(paths):
+    return tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths)
+
+
+def watch(simulation, path=CATALOGUE_FILE, fuses_path=FUSES_FILE, interval=1.0, callback=None, max_updates=None):
+    # Surveille le catalogue et les profils de fusée (date de modification, relevée toutes les interval
+    # secondes) ; à chaque changement, recharge le catalogue, met à jour les cellules touchées et appelle
+    # callback(simulation). Un fichier illisible (enregistrement en cours, erreur de saisie) est signalé et
+    # la surveillance continue. Retourne le nombre de mises à jour.
+    paths = (path, fuses_path)
+    seen = _mtimes(paths)
+    updates = 0
+    while max_updates is None or updates < max_updates:
+        time.sleep(interval)
+        current = _mtimes(paths)
+        if current == seen:
+            continue
+        seen = current
+        try:
+            catalogue = Catalogue.from_csv(path, fuses_path)
+        except (OSError, ValueError, KeyError, StopIteration) as error:
+            print(f"Catalogue illisible, en attente d'une correction : {error!r}", file=sys.stderr)
+            continue
+        simulation.update(catalogue=catalogue)
+        updates += 1
+        if callback is not None:
+            callback(simulation)
+    return updates
+
+
+def print_changes(simulation, stream=None):
+    # Résultats des cellules réévaluées par la dernière mise à jour
+    stream = stream or sys.stdout
+    results = simulation.results
+    print(f"\n{len(simulation.recomputed)} cellule(s) recalculée(s)", file=stream)
+    for name, mode in simulation.recomputed:
+        i, j = results.names.index(name), results.modes.index(mode)
+        neutralized = "Oui" if results.neutralized[i, j] else "Non"
+        print(f"{name:<40} | mode {mode} | {results.totals[i, j]:>10.2f} | {neutralized}", file=stream)
+
+
+def check_incremental(system="Goalkeeper CIWS", base_tracking_factor=0.8):
+    # Modifie une ligne du catalogue : la mise à jour incrémentale doit donner exactement le calcul complet
+    # en ne réévaluant que les cellules de cette ligne. Retourne (conforme, temps complet, temps incrémental).
+    from .simulation import Simulation
+
+    scenario = Scenario()
+    simulation = IncrementalSimulation(scenario)
+    simulation.update()
+    # Calcul complet mesuré après un premier passage (imports, trajectoires en cache) pour une comparaison juste
+    start = time.perf_counter()
+    IncrementalSimulation(scenario, simulation.catalogue, simulation.trajectories).update()
+    full_time = time.perf_counter() - start
+
+    catalogue = simulation.catalogue.replace(system, base_tracking_factor=base_tracking_factor)
+    start = time.perf_counter()
+    incremental = simulation.update(catalogue=catalogue)
+    incremental_time = time.perf_counter() - start
+
+    reference = Simulation(catalogue).run(scenario)
+    ok = (sorted(simulation.recomputed) == [(system, mode) for mode in scenario.modes]
+          and np.array_equal(incremental.hits, reference.hits) and np.array_equal(incremental.totals, reference.totals))
+    return ok, full_time, incremental_time
+
+
+def main():
+    ok, full_time, incremental_time = check_incremental()
+    print(f"Calcul complet {full_time * 1e3:.1f} ms, mise à jour d'une ligne {incremental_time * 1e3:.1f} ms : "
+          f"{'OK' if ok else 'ÉCHEC'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Rejeu 3D d'un engagement exporté en MP4 ou GIF : images décimées à une cadence cible et diffusées à l'encodeur.
+
+La scène fixe (trajectoire complète, axes, légendes) est tracée une seule fois ; chaque image ne redessine que
+les artistes animés (missile, trace, compteur de hits) sur le fond mémorisé (blitting). Le nombre d'images
+dépend de la durée de l'engagement et de fps, pas de dt.
+Les images sont écrites au fil de l'eau, aucune n'est gardée en mémoire : avec ffmpeg, dans son entrée standard ;
+sans ffmpeg (GIF seulement), chaque image est encodée par Pillow et ses blocs ajoutés aussitôt au fichier, en ne
+gardant que la zone modifiée depuis l'image précédente.
+Vérification : python -m simulateur.rejeu [fichier.gif|fichier.mp4] (export MP4 vérifié si ffmpeg est installé)
+"""
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .profilage import counted
+from .rendu import MODE_LABELS, _pyplot
+
+MAX_TRAIL_POINTS = 2000  # points de la trace du missile, quel que soit dt
+
+
+def frame_indices(time_array, n_steps, fps=25, speed=1.0):
+    # Indices de la grille de simulation retenus pour chaque image : une image toutes les speed / fps secondes
+    # de temps simulé, jusqu'à l'impact inclus
+    time_array = np.asarray(time_array, dtype=float)
+    last = min(n_steps, len(time_array) - 1)
+    frame_times = np.arange(time_array[0], time_array[last], speed / fps)
+    indices = np.minimum(np.searchsorted(time_array, frame_times), last)
+    return np.unique(np.append(indices, last))
+
+
+def _impact_step(x):
+    # Premier pas où le missile atteint le navire (x <= 0) dans des résultats déjà calculés
+    impact = np.flatnonzero(np.asarray(x) <= 0)
+    return int(impact[0]) if impact.size else len(x) - 1
+
+
+class _FFmpegStream:
+    # Images RGBA brutes écrites au fil de l'eau dans l'entrée standard de ffmpeg
+    def __init__(self, path, fps, width, height, executable):
+        codec = [] if path.lower().endswith('.gif') else ['-vcodec', 'libx264', '-pix_fmt', 'yuv420p']
+        command = [executable, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                   '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+                   # yuv420p impose des dimensions paires
+                   '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', *codec, path]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, rgba):
+        self._process.stdin.write(rgba.tobytes())
+
+    def close(self):
+        self._process.stdin.close()
+        if self._process.wait():
+            raise RuntimeError(f"ffmpeg a échoué (code {self._process.returncode})")
+
+
+def _skip_sub_blocks(data, position):
+    # Saute une suite de sous-blocs GIF (longueur, octets...) terminée par un bloc de longueur nulle
+    while data[position]:
+        position += data[position] + 1
+    return position + 1
+
+
+def _gif_parts(image):
+    # Encode une image en palette avec Pillow et découpe le GIF obtenu : (descripteur d'écran logique,
+    # palette, bits de taille de la palette, descripteur d'image, données LZW)
+    buffer = io.BytesIO()
+    # optimize=False : Pillow garde la palette et les indices tels quels (index de transparence compris) ;
+    # interlace=False : lignes dans l'ordre, le descripteur réécrit par _GifStream n'a pas le drapeau d'entrelacement
+    image.save(buffer, format='GIF', optimize=False, interlace=False)
+    data = buffer.getvalue()
+    screen = data[6:13]
+    position = 13
+    palette, bits = b'', 0
+    if screen[4] & 0x80:
+        bits = screen[4] & 0x07
+        palette = data[position:position + (3 << (bits + 1))]
+        position += len(palette)
+    # Extensions éventuelles (commentaire, contrôle graphique) : remplacées par les nôtres
+    while data[position] == 0x21:
+        position = _skip_sub_blocks(data, position + 2)
+    descriptor = data[position:position + 10]
+    position += 10
+    if descriptor[9] & 0x80:
+        bits = descriptor[9] & 0x07
+        palette = data[position:position + (3 << (bits + 1))]
+        position += len(palette)
+    start = position
+    position = _skip_sub_blocks(data, position + 1)  # taille de code LZW puis sous-blocs
+    return screen, palette, bits, descriptor, data[start:position]
+
+
+class _GifStream:
+    # Repli sans ffmpeg : GIF animé écrit image par image. Chaque image ne porte que le rectangle modifié depuis
+    # la précédente (les images sont superposées), avec sa propre palette ; dans ce rectangle, les pixels
+    # inchangés prennent l'index transparent, que LZW compresse presque entièrement. Seule l'image précédente
+    # est gardée en mémoire.
+    TRANSPARENT = 255
+    def __init__(self, path, fps):
+        self._file = open(path, 'wb')
+        self.delay = max(2, round(100 / fps))  # centièmes de seconde
+        self._previous = None
+
+    def write(self, rgba):
+        from PIL import Image
+
+        rgb = rgba[:, :, :3]
+        if self._previous is None:
+            changed = np.ones(rgb.shape[:2], dtype=bool)
+            top, bottom, left, right = 0, rgb.shape[0], 0, rgb.shape[1]
+        else:
+            changed = np.any(rgb != self._previous, axis=2)
+            rows, columns = np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+            if rows.size:
+                top, bottom, left, right = rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+            else:
+                # Image identique : un pixel inchangé suffit à porter la durée d'affichage
+                top, bottom, left, right = 0, 1, 0, 1
+        region = Image.fromarray(np.ascontiguousarray(rgb[top:bottom, left:right]))
+        quantized = region.quantize(colors=self.TRANSPARENT, method=Image.Quantize.FASTOCTREE)
+        indices = np.array(quantized)
+        indices[~changed[top:bottom, left:right]] = self.TRANSPARENT
+        frame = Image.fromarray(indices, mode='P')
+        frame.putpalette(quantized.getpalette()[:3 * self.TRANSPARENT] + [0, 0, 0] * (256 - self.TRANSPARENT)
+                         if len(quantized.getpalette()) >= 3 * self.TRANSPARENT else
+                         quantized.getpalette() + [0, 0, 0] * (256 - len(quantized.getpalette()) // 3))
+        screen, palette, bits, descriptor, image_data = _gif_parts(frame)
+
+        if self._previous is None:
+            # En-tête : écran logique de la première image (pleine taille) sans palette globale, boucle infinie
+            self._file.write(b'GIF89a' + screen[:4] + bytes([screen[4] & 0x70, 0, 0]))
+            self._file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+        self._previous = rgb.copy()
+        # Contrôle graphique : image précédente laissée en place (disposition 1), index transparent, durée
+        self._file.write(b'\x21\xf9\x04\x05' + self.delay.to_bytes(2, 'little') + bytes([self.TRANSPARENT, 0]))
+        self._file.write(b'\x2c' + int(left).to_bytes(2, 'little') + int(top).to_bytes(2, 'little') + descriptor[5:9]
+                         + bytes([0x80 | (descriptor[9] & 0x40) | bits]) + palette + image_data)
+
+    def close(self):
+        if self._previous is not None:
+            self._file.write(b'\x3b')
+        self._file.close()
+
+
+def open_writer(path, fps, width, height):
+    executable = shutil.which('ffmpeg')
+    if executable:
+        return _FFmpegStream(path, fps, width, height, executable)
+    if path.lower().endswith('.gif'):
+        return _GifStream(path, fps)
+    raise RuntimeError("L'export MP4 nécessite ffmpeg (introuvable dans le PATH) ; utiliser un fichier .gif")
+
+
+class ReplayScene:
+    # Une vue 3D par mode : trajectoire complète en fond (fixe), missile, trace et compteur animés
+    def __init__(self, name, system_results, modes, time_array, kill_threshold=None, dpi=100):
+        plt = self._plt = _pyplot()
+        self.modes = list(modes)
+        self.time_array = np.asarray(time_array, dtype=float)
+        self.kill_threshold = kill_threshold
+        self.series = [system_results[mode] for mode in self.modes]
+        columns = 2 if len(self.modes) > 1 else 1
+        rows = -(-len(self.modes) // columns)
+        self.fig = plt.figure(figsize=(8 * columns, 5 * rows), dpi=dpi)
+        self.fig.suptitle(name)
+        self.axes, self.trails, self.markers, self.labels = [], [], [], []
+        for i, (mode, series) in enumerate(zip(self.modes, self.series), 1):
+            n = _impact_step(series['x'])
+            x, y, z = (np.asarray(series[axis])[:n + 1] for axis in ('x', 'y', 'z'))
+            ax = self.fig.add_subplot(rows, columns, i, projection='3d')
+            ax.plot(x, y, z, color='lightgray', linewidth=1)
+            ax.set_title(MODE_LABELS.get(mode, f"Mode {mode}"))
+            ax.set_xlabel("Distance (m)")
+            ax.set_ylabel("Y (m)")
+            ax.set_zlabel("Altitude (m)")
+            self.trails.append(ax.plot([], [], [], color='blue', animated=True)[0])
+            self.markers.append(ax.plot([], [], [], 'o', color='blue', animated=True)[0])
+            self.labels.append(ax.text2D(0.02, 0.95, '', transform=ax.transAxes, animated=True))
+            self.axes.append(ax)
+        self.fig.tight_layout()
+        self._background = None
+
+    @property
+    def size(self):
+        width, height = self.fig.canvas.get_width_height(physical=True)
+        return width, height
+
+    def n_steps(self):
+        return max(_impact_step(series['x']) for series in self.series)
+
+    def draw_frame(self, k):
+        # Image au pas k : fond restauré puis artistes animés seulement ; retourne le tampon RGBA
+        canvas = self.fig.canvas
+        if self._background is None:
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+        canvas.restore_region(self._background)
+        for series, trail, marker, label, ax in zip(self.series, self.trails, self.markers, self.labels, self.axes):
+            end = min(k, _impact_step(series['x']))
+            stride = max(1, end // MAX_TRAIL_POINTS)
+            trail_x, trail_y, trail_z = (np.append(np.asarray(series[axis])[:end:stride], series[axis][end])
+                                         for axis in ('x', 'y', 'z'))
+            trail.set_data_3d(trail_x, trail_y, trail_z)
+            marker.set_data_3d(trail_x[-1:], trail_y[-1:], trail_z[-1:])
+            hits = float(series['cumulative_hits'][end])
+            neutralized = self.kill_threshold is not None and hits >= self.kill_threshold
+            marker.set_color('red' if neutralized else 'blue')
+            label.set_text(f"t = {self.time_array[k]:.2f} s   hits = {hits:.1f}" +
+                           ("   neutralisé" if neutralized else ""))
+            for artist in (trail, marker, label):
+                ax.draw_artist(artist)
+        return np.asarray(canvas.buffer_rgba())
+
+    def close(self):
+        self._plt.close(self.fig)
+
+
+@counted()
+def export_replay(results, name, modes, time_array, path, kill_threshold=None, fps=25, speed=1.0, dpi=100):
+    # Exporte le rejeu de results[name] (un panneau par mode) ; speed > 1 accélère le temps simulé.
+    # Retourne le nombre d'images écrites.
+    scene = ReplayScene(name, results[name], modes, time_array, kill_threshold, dpi)
+    try:
+        frames = frame_indices(time_array, scene.n_steps(), fps, speed)
+        writer = open_writer(path, fps, *scene.size)
+        try:
+            for k in frames:
+                writer.write(scene.draw_frame(k))
+        finally:
+            writer.close()
+    finally:
+        scene.close()
+    return len(frames)
+
+
+def check_gif_stream(frames=12, size=(48, 64), seed=0):
+    # Images synthétiques de peu de couleurs (quantification exacte) où seuls de petits rectangles changent :
+    # chaque image relue par Pillow doit être identique, pixel pour pixel, à celle écrite par _GifStream
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    colors = rng.integers(0, 256, (6, 3), dtype=np.uint8)
+    rgba = np.full(size + (4,), 255, dtype=np.uint8)
+    rgba[:, :, :3] = colors[0]
+    expected = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'essai.gif')
+        writer = _GifStream(path, fps=10)
+        for k in range(frames):
+            if k:
+                top, left = rng.integers(0, size[0] - 8), rng.integers(0, size[1] - 8)
+                rgba[top:top + 8, left:left + 8, :3] = colors[rng.integers(0, len(colors))]
+            writer.write(rgba)
+            expected.append(rgba[:, :, :3].copy())
+        writer.close()
+        with Image.open(path) as image:
+            if image.n_frames != frames:
+                return False
+            for k in range(frames):
+                image.seek(k)
+                if not np.array_equal(np.asarray(image.convert('RGB')), expected[k]):
+                    return False
+    return True
+
+
+def check_ffmpeg(results, name, modes, time_array, kill_threshold):
+    # Export MP4 par le tube ffmpeg (format des images brutes, arguments) ; None si ffmpeg n'est pas installé
+    if shutil.which('ffmpeg') is None:
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'rejeu.mp4')
+        export_replay(results, name, modes, time_array, path, kill_threshold, fps=10, speed=4.0, dpi=40)
+        return os.path.getsize(path) > 0
+
+
+def main(argv=None):
+    from .simulation import Scenario, Simulation
+
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else 'rejeu_Goalkeeper_CIWS.gif'
+    scenario = Scenario()
+    results = Simulation().run(scenario)
+    name = "Goalkeeper CIWS"
+    kill_threshold = results.kill_threshold[results.names.index(name)]
+    start = time.perf_counter()
+    frames = export_replay(results, name, scenario.modes, scenario.time_array(), path, kill_threshold, fps=15,
+                           speed=2.0, dpi=60)
+    print(f"{path} : {frames} images en {time.perf_counter() - start:.1f} s, {os.path.getsize(path) / 1024:.0f} Ko")
+    ok = check_gif_stream()
+    print(f"GIF écrit au fil de l'eau, relu image par image : {'OK' if ok else 'ÉCHEC'}")
+    mp4 = check_ffmpeg(results, name, scenario.modes, scenario.time_array(), kill_threshold)
+    if mp4 is None:
+        print("ffmpeg introuvable : vérification de l'export MP4 ignorée")
+    else:
+        print(f"Export MP4 par ffmpeg : {'OK' if mp4 else 'ÉCHEC'}")
+        ok = ok and mp4
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,475 @@
+"""Rendu des graphiques à partir des résultats, en processus parallèles sur le backend Agg (sans affichage)."""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from math import pi
+
+import numpy as np
+
+from .profilage import counted, phase
+
+# Préréglages de qualité : brouillon rapide ou figures pour publication
+QUALITY_PRESETS = {
+    'draft': {'dpi': 72},
+    'publication': {'dpi': 300},
+}
+MODE_LABELS = {1: "Vol direct", 2: "Vol manœuvrant", 3: "Vol pop-up", 4: "Vol combiné"}
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+
+# Systèmes mis en avant dans les graphiques comparatifs
+TOP_SYSTEMS = [
+    "Phalanx Block 1B Baseline 2",
+    "Goalkeeper CIWS",
+    "Type 1130 / H/PJ-11",
+    "Pantsir-M",
+    "GOKDENIZ",
+    "Oerlikon Millennium Gun",
+    "RapidFire",
+    "OTO Melara 76mm Strales"
+]
+COMPARISON_SYSTEMS = [
+    "Phalanx Block 1B Baseline 2",
+    "Type 1130 / H/PJ-11",
+    "GOKDENIZ",
+    "RapidFire",
+    "Goalkeeper CIWS"
+]
+SELECTED_CIWS = ["Phalanx Block 1B", "Goalkeeper CIWS", "Type 1130 / H/PJ-11", "RapidFire", "Oerlikon Millennium Gun",
+                 "GOKDENIZ",
+                 "Phalanx Block 1B Baseline 2 (Low Rate)", "Oerlikon Millennium Gun (Low Rate)",
+                 "Goalkeeper CIWS (Low Rate)",
+                 "RAPIDSeaGuardian", "Skyguard 35mm"]
+DETAILED_CIWS = "Type 1130 / H/PJ-11"
+
+
+def safe_name(name):
+    # Nom de système utilisable dans un nom de fichier ("Type 1130 / H/PJ-11" -> "Type_1130_H_PJ-11")
+    return re.sub(r'[^\w.-]+', '_', name).strip('_')
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _report_style():
+    # Style des graphiques comparatifs (palette husl de seaborn si disponible)
+    plt = _pyplot()
+    rc = {}
+    try:
+        import seaborn as sns
+        from cycler import cycler
+        rc['axes.prop_cycle'] = cycler(color=sns.color_palette("husl"))
+    except ImportError:
+        pass
+    return plt.style.context('seaborn-v0_8-darkgrid'), plt.rc_context(rc)
+
+
+def _save(fig, path, dpi):
+    plt = _pyplot()
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def _write_canvas(fig, path, extra_artists=()):
+    # Écrit le canevas déjà dessiné, recadré comme avec bbox_inches='tight' mais sans second tracé : la boîte
+    # englobante est calculée sur le rendu existant (plus celle des artistes animés, absents de
+    # get_tightbbox) et le tampon est encodé directement en PNG
+    from PIL import Image
+    from matplotlib.transforms import Bbox
+
+    renderer = fig.canvas.get_renderer()
+    boxes = [fig.get_tightbbox(renderer)]
+    boxes += [artist.get_window_extent(renderer).transformed(fig.dpi_scale_trans.inverted())
+              for artist in extra_artists]
+    pad = fig.dpi * 0.1  # pad_inches par défaut de savefig
+    x0, y0, x1, y1 = Bbox.union(boxes).extents * fig.dpi
+    buffer = np.asarray(fig.canvas.buffer_rgba())
+    height, width = buffer.shape[:2]
+    top, bottom = max(0, int(height - y1 - pad)), min(height, int(np.ceil(height - y0 + pad)))
+    left, right = max(0, int(x0 - pad)), min(width, int(np.ceil(x1 + pad)))
+    Image.fromarray(buffer[top:bottom, left:right]).save(path, dpi=(fig.dpi, fig.dpi))
+    return path
+
+
+class SystemFigures:
+    # Figures par système (trajectoires 3D 2×2, séries temporelles 2×modes) construites une seule fois : pour
+    # chaque système, seules les données des courbes (set_data) et les titres changent avant l'écriture sur
+    # disque. La mémoire reste constante quel que soit le nombre de systèmes rendus.
+    # La trajectoire du missile ne dépend pas du système : tant qu'elle ne change pas, la scène 3D n'est pas
+    # redessinée, seuls les titres (artistes animés) sont tracés sur le fond mémorisé (blitting).
+    def __init__(self, modes, time_array, dpi):
+        plt = _pyplot()
+        self._plt = plt
+        self.modes = list(modes)
+        self._background = None
+        self._trajectories = None
+        self._laid_out = False
+
+        self.trajectory_fig = plt.figure(figsize=(20, 10), dpi=dpi)
+        self.trajectory_axes = []
+        self.trajectory_lines = []
+        for i, mode in enumerate(self.modes, 1):
+            ax = self.trajectory_fig.add_subplot(2, 2, i, projection='3d')
+            line, = ax.plot([], [], [], label=MODE_LABELS[mode], color='blue')
+            ax.set_title(MODE_LABELS[mode])
+            ax.set_xlabel("Distance (m)")
+            ax.set_ylabel("Y (m)")
+            ax.set_zlabel("Altitude (m)")
+            ax.legend()
+            self.trajectory_axes.append(ax)
+            self.trajectory_lines.append(line)
+
+        self.series_fig, self.series_axes = plt.subplots(2, len(self.modes), figsize=(20, 8), dpi=dpi, sharex=True,
+                                                         sharey='row', squeeze=False)
+        zeros = np.zeros_like(time_array, dtype=float)
+        self.rate_lines = []
+        self.cumulative_lines = []
+        for i in range(len(self.modes)):
+            self.rate_lines.append(self.series_axes[0, i].plot(time_array, zeros, color='purple')[0])
+            self.series_axes[0, i].set_ylabel("Hits/s (obus ou fragments)")
+            self.cumulative_lines.append(self.series_axes[1, i].plot(time_array, zeros, color='orange')[0])
+            self.series_axes[1, i].set_xlabel("Temps (s)")
+            self.series_axes[1, i].set_ylabel("Hits cumulés")
+
+    def _trajectory_changed(self, system_results):
+        trajectories = [tuple(system_results[mode][axis] for axis in ('x', 'y', 'z')) for mode in self.modes]
+        changed = self._trajectories is None or not all(
+            np.array_equal(a, b) for old, new in zip(self._trajectories, trajectories) for a, b in zip(old, new))
+        self._trajectories = trajectories
+        return changed
+
+    def update(self, name, system_results):
+        if self._trajectory_changed(system_results):
+            for ax, line, (x, y, z) in zip(self.trajectory_axes, self.trajectory_lines, self._trajectories):
+                line.set_data_3d(x, y, z)
+                ax.auto_scale_xyz(x, y, z, had_data=False)
+            self._background = None
+        for ax, mode in zip(self.trajectory_axes, self.modes):
+            # set_text et non set_title : Axes3D.set_title décale le titre à chaque appel
+            ax.title.set_text(f"{name} - {MODE_LABELS[mode]}")
+        for i, mode in enumerate(self.modes):
+            self.rate_lines[i].set_ydata(system_results[mode]['hits_per_sec'])
+            self.cumulative_lines[i].set_ydata(system_results[mode]['cumulative_hits'])
+            self.series_axes[0, i].set_title(f"{name} - {MODE_LABELS[mode]}")
+        for ax in self.series_axes.flat:
+            ax.relim()
+            ax.autoscale_view()
+        # Mise en page calculée une fois, sur le premier système
+        if not self._laid_out:
+            self.trajectory_fig.tight_layout()
+            self.series_fig.tight_layout()
+            self._laid_out = True
+
+    def _draw_trajectories(self):
+        canvas = self.trajectory_fig.canvas
+        titles = [ax.title for ax in self.trajectory_axes]
+        if self._background is not None:
+            canvas.restore_region(self._background)
+            for title in titles:
+                self.trajectory_fig.draw_artist(title)
+            return
+        # Tracé complet, titres compris (leur position dépend du tracé), puis fond sans les titres, animés
+        # jusqu'au prochain changement de trajectoire
+        for title in titles:
+            title.set_animated(False)
+        canvas.draw()
+        for title in titles:
+            title.set_animated(True)
+        canvas.draw()
+        self._background = canvas.copy_from_bbox(self.trajectory_fig.bbox)
+        for title in titles:
+            self.trajectory_fig.draw_artist(title)
+
+    def save(self, name, system_results, trajectory_path, series_path):
+        self.update(name, system_results)
+        self._draw_trajectories()
+        _write_canvas(self.trajectory_fig, trajectory_path, [ax.title for ax in self.trajectory_axes])
+        self.series_fig.canvas.draw()
+        _write_canvas(self.series_fig, series_path)
+        return [trajectory_path, series_path]
+
+    def close(self):
+        self._plt.close(self.trajectory_fig)
+        self._plt.close(self.series_fig)
+
+
+def system_figure_paths(name, output_dir='.'):
+    return (os.path.join(output_dir, f'ciws_trajectoires_3d_{safe_name(name)}.png'),
+            os.path.join(output_dir, f'ciws_series_temporelles_{safe_name(name)}.png'))
+
+
+@counted()
+def render_system_figures(results, names, modes, time_array, output_dir='.', dpi=300):
+    # Trajectoires 3D et séries temporelles de chaque système de names, avec une seule paire de figures
+    figures = SystemFigures(modes, time_array, dpi)
+    files = []
+    try:
+        for name in names:
+            files += figures.save(name, results[name], *system_figure_paths(name, output_dir))
+    finally:
+        figures.close()
+    return files
+
+
+@counted()
+def plot_comparison_barplot(totals, modes, jamming_level, path, dpi):
+    plt = _pyplot()
+    style, rc = _report_style()
+    with style, rc:
+        fig, ax = plt.subplots(figsize=(16, 10))
+        modes_labels = [MODE_LABELS[mode] for mode in modes]
+        x = np.arange(len(modes_labels))
+        width = 0.1
+        systems = [name for name in TOP_SYSTEMS if name in totals]
+        for idx, ciws_name in enumerate(systems):
+            hits_by_mode = [totals[ciws_name][mode] for mode in modes]
+            offset = (idx - len(systems) / 2) * width
+            ax.bar(x + offset, hits_by_mode, width, label=ciws_name)
+
+        ax.set_xlabel('Mode de vol', fontsize=14, fontweight='bold')
+        ax.set_ylabel('Impacts cumulés', fontsize=14, fontweight='bold')
+        ax.set_title('Comparaison des performances des systèmes CIWS\n'
+                     f'contre missile Exocet MM40 (Brouillage {jamming_level:.0%})',
+                     fontsize=16, fontweight='bold')
+        ax.set_xticks(x)
+        ax.set_xticklabels(modes_labels)
+        ax.legend(loc='upper left', fontsize=10)
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        return _save(fig, path, dpi)
+
+
+@counted()
+def plot_neutralization_heatmap(totals, kill_thresholds, modes, path, dpi):
+    plt = _pyplot()
+    style, rc = _report_style()
+    with style, rc:
+        fig, ax = plt.subplots(figsize=(14, 10))
+        modes_labels = [MODE_LABELS[mode] for mode in modes]
+
+        # Matrice de neutralisation (Oui=1, Non=0), 25 premiers systèmes
+        system_names = list(kill_thresholds)[:25]
+        neutralization_matrix = [[1 if totals[name][mode] >= kill_thresholds[name] else 0 for mode in modes]
+                                 for name in system_names]
+
+        im = ax.imshow(neutralization_matrix, cmap='RdYlGn', aspect='auto', vmin=0, vmax=1)
+        ax.set_xticks(np.arange(len(modes_labels)))
+        ax.set_yticks(np.arange(len(system_names)))
+        ax.set_xticklabels(modes_labels, fontsize=11)
+        ax.set_yticklabels(system_names, fontsize=9)
+        plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
+
+        for i in range(len(system_names)):
+            for j in range(len(modes_labels)):
+                ax.text(j, i, '✓' if neutralization_matrix[i][j] else '✗',
+                        ha="center", va="center", color="black", fontsize=12, fontweight='bold')
+
+        ax.set_title('Matrice de neutralisation des systèmes CIWS\n(✓ = Neutralisation réussie)',
+                     fontsize=14, fontweight='bold', pad=20)
+        fig.colorbar(im, ax=ax, label='Taux de neutralisation')
+        fig.tight_layout()
+        return _save(fig, path, dpi)
+
+
+@counted()
+def plot_temporal_analysis(name, system_results, modes, time_array, path, dpi):
+    plt = _pyplot()
+    style, rc = _report_style()
+    with style, rc:
+        fig, axes = plt.subplots(2, 2, figsize=(16, 10))
+        fig.suptitle(f'Analyse détaillée : {name}', fontsize=16, fontweight='bold')
+        for idx, mode in enumerate(modes):
+            ax1 = axes[idx // 2, idx % 2]
+            ax2 = ax1.twinx()
+
+            # Distance du missile
+            line1 = ax1.plot(time_array, system_results[mode]['x'],
+                             color=COLORS[idx], linewidth=2, label='Distance missile')
+            ax1.set_xlabel('Temps (s)', fontsize=11)
+            ax1.set_ylabel('Distance (m)', fontsize=11, color=COLORS[idx])
+            ax1.tick_params(axis='y', labelcolor=COLORS[idx])
+
+            # Impacts cumulés
+            line2 = ax2.plot(time_array, system_results[mode]['cumulative_hits'],
+                             color='red', linewidth=2, linestyle='--', label='Impacts cumulés')
+            ax2.set_ylabel('Impacts cumulés', fontsize=11, color='red')
+            ax2.tick_params(axis='y', labelcolor='red')
+
+            ax1.set_title(f'{MODE_LABELS[mode]}', fontsize=12, fontweight='bold')
+            ax1.grid(True, alpha=0.3)
+
+            # Légende combinée
+            lines = line1 + line2
+            ax1.legend(lines, [line.get_label() for line in lines], loc='upper left', fontsize=9)
+        fig.tight_layout()
+        return _save(fig, path, dpi)
+
+
+@counted()
+def plot_radar_comparison(totals, modes, path, dpi):
+    plt = _pyplot()
+    style, rc = _report_style()
+    with style, rc:
+        fig, ax = plt.subplots(figsize=(12, 12), subplot_kw=dict(projection='polar'))
+        categories = [MODE_LABELS[mode] for mode in modes]
+        angles = [n / float(len(categories)) * 2 * pi for n in range(len(categories))]
+        angles += angles[:1]
+
+        systems = [name for name in COMPARISON_SYSTEMS if name in totals]
+        for ciws_name in systems:
+            values = [totals[ciws_name][mode] for mode in modes]
+            values += values[:1]
+            ax.plot(angles, values, 'o-', linewidth=2, label=ciws_name)
+            ax.fill(angles, values, alpha=0.15)
+
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(categories, fontsize=11)
+        ax.set_ylim(0, max(totals[name][mode] for name in systems for mode in modes) * 1.1)
+        ax.set_title('Comparaison multi-scénarios des systèmes CIWS\n(Nombre d\'impacts)',
+                     fontsize=14, fontweight='bold', pad=30)
+        ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=10)
+        ax.grid(True)
+        fig.tight_layout()
+        return _save(fig, path, dpi)
+
+
+@counted()
+def plot_statistics_summary(totals, kill_thresholds, modes, path, dpi):
+    plt = _pyplot()
+    style, rc = _report_style()
+    with style, rc:
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+        top15 = list(kill_thresholds)[:15]
+
+        # Graphique 1 : taux de succès moyen par système
+        success_rates = {}
+        for name in top15:
+            successes = sum(1 for mode in modes if totals[name][mode] >= kill_thresholds[name])
+            success_rates[name] = (successes / len(modes)) * 100
+
+        sorted_systems = sorted(success_rates.items(), key=lambda x: x[1], reverse=True)
+        names, rates = zip(*sorted_systems)
+        ax1.barh(range(len(names)), rates, color=plt.cm.RdYlGn(np.array(rates) / 100))
+        ax1.set_yticks(range(len(names)))
+        ax1.set_yticklabels(names, fontsize=9)
+        ax1.set_xlabel('Taux de neutralisation moyen (%)', fontsize=12, fontweight='bold')
+        ax1.set_title('Efficacité globale des systèmes CIWS', fontsize=13, fontweight='bold')
+        ax1.grid(True, alpha=0.3, axis='x')
+        for i, (name, rate) in enumerate(sorted_systems):
+            ax1.text(rate + 1, i, f'{rate:.0f}%', va='center', fontsize=9, fontweight='bold')
+
+        # Graphique 2 : impacts moyens par mode de vol
+        bp = ax2.boxplot([[totals[name][mode] for name in top15] for mode in modes],
+                         tick_labels=[MODE_LABELS[mode] for mode in modes],
+                         patch_artist=True,
+                         showmeans=True)
+        for patch, color in zip(bp['boxes'], COLORS):
+            patch.set_facecolor(color)
+            patch.set_alpha(0.6)
+
+        ax2.set_ylabel('Nombre d\'impacts', fontsize=12, fontweight='bold')
+        ax2.set_title('Distribution des impacts par mode de vol\n(Top 15 systèmes)',
+                      fontsize=13, fontweight='bold')
+        ax2.grid(True, alpha=0.3, axis='y')
+        fig.tight_layout()
+        return _save(fig, path, dpi)
+
+
+@counted()
+def plot_jamming_heatmaps(cube, systems, modes, jamming_levels, kill_thresholds, path, dpi):
+    # Cube (système, mode, brouillage) de hits : une carte par mode (système × niveau de brouillage) colorée par
+    # hits / seuil de destruction (échelle log, > 1 = neutralisé) ; le trait noir marque, pour chaque système,
+    # le niveau de brouillage où la neutralisation change
+    plt = _pyplot()
+    from matplotlib.colors import LogNorm
+
+    style, rc = _report_style()
+    levels = np.asarray(jamming_levels, dtype=float)
+    ratio = np.asarray(cube, dtype=float) / np.asarray(kill_thresholds, dtype=float)[:, None, None]
+    # Largeur d'une colonne ; un seul niveau (ou des niveaux confondus) : largeur 0,1 centrée sur ce niveau
+    step = (levels[-1] - levels[0]) / (len(levels) - 1) if len(levels) > 1 else 0.0
+    step = step or 0.1
+    extent = (levels[0] - step / 2, levels[-1] + step / 2, len(systems) - 0.5, -0.5)
+    columns = 2 if len(modes) > 1 else 1
+    rows = -(-len(modes) // columns)
+    with style, rc:
+        fig, axes = plt.subplots(rows, columns, figsize=(8 * columns + 3, max(4.0, 0.2 * len(systems)) * rows),
+                                 sharey=True, squeeze=False)
+        for ax, (j, mode) in zip(axes.flat, enumerate(modes)):
+            im = ax.imshow(np.clip(ratio[:, j, :], 0.1, 10), aspect='auto', cmap='RdYlGn',
+                           norm=LogNorm(vmin=0.1, vmax=10), extent=extent, interpolation='nearest')
+            neutralized = ratio[:, j, :] >= 1
+            system_index, level_index = np.nonzero(neutralized[:, 1:] != neutralized[:, :-1])
+            ax.vlines((levels[level_index] + levels[level_index + 1]) / 2, system_index - 0.45, system_index + 0.45,
+                      colors='black', linewidths=2)
+            ax.set_title(MODE_LABELS[mode], fontsize=13, fontweight='bold')
+            ax.set_xlabel('Niveau de brouillage')
+            ax.set_yticks(np.arange(len(systems)))
+            ax.set_yticklabels(systems, fontsize=7)
+            ax.grid(False)
+        for ax in axes.flat[len(modes):]:
+            ax.set_visible(False)
+        fig.suptitle('Marge de neutralisation en fonction du brouillage (impacts cumulés / seuil)',
+                     fontsize=15, fontweight='bold')
+        fig.colorbar(im, ax=axes, label='Impacts cumulés / seuil de destruction', shrink=0.6)
+        return _save(fig, path, dpi)
+
+
+def render_jobs(results, kill_thresholds, modes, time_array, jamming_level, output_dir='.',
+                selected_ciws=SELECTED_CIWS, detailed_ciws=DETAILED_CIWS, dpi=300, batches=1):
+    # Liste des tâches de rendu : (fonction, arguments). Chaque tâche ne reçoit que les données de ses graphiques ;
+    # les graphiques par système sont répartis en batches lots, chacun rendu avec ses figures recyclées.
+    # Les systèmes absents de results (catalogue personnalisé) sont ignorés, et un graphique sans aucun de ses
+    # systèmes n'est pas rendu.
+    totals = {name: {mode: float(results[name][mode]['hits']) for mode in modes} for name in results}
+    selected_ciws = [name for name in selected_ciws if name in results]
+    jobs = []
+    # Lots contigus : la liste des fichiers garde l'ordre de selected_ciws
+    size = max(1, -(-len(selected_ciws) // max(1, batches)))
+    for start in range(0, len(selected_ciws), size):
+        names = list(selected_ciws[start:start + size])
+        jobs.append((render_system_figures,
+                     ({name: results[name] for name in names}, names, modes, time_array, output_dir, dpi)))
+    if any(name in totals for name in TOP_SYSTEMS):
+        jobs.append((plot_comparison_barplot,
+                     (totals, modes, jamming_level, os.path.join(output_dir, 'ciws_comparison_barplot.png'), dpi)))
+    jobs.append((plot_neutralization_heatmap,
+                 (totals, kill_thresholds, modes, os.path.join(output_dir, 'ciws_neutralization_heatmap.png'), dpi)))
+    if detailed_ciws in results:
+        jobs.append((plot_temporal_analysis,
+                     (detailed_ciws, results[detailed_ciws], modes, time_array,
+                      os.path.join(output_dir, f'ciws_temporal_analysis_{safe_name(detailed_ciws)}.png'), dpi)))
+    if any(name in totals for name in COMPARISON_SYSTEMS):
+        jobs.append((plot_radar_comparison,
+                     (totals, modes, os.path.join(output_dir, 'ciws_radar_comparison.png'), dpi)))
+    jobs.append((plot_statistics_summary,
+                 (totals, kill_thresholds, modes, os.path.join(output_dir, 'ciws_statistics_summary.png'), dpi)))
+    return jobs
+
+
+def render_report(results, kill_thresholds, modes, time_array, jamming_level, output_dir='.', quality='publication',
+                  max_workers=None, **kwargs):
+    # Rend toutes les familles de graphiques et retourne la liste des fichiers écrits
+    os.makedirs(output_dir, exist_ok=True)
+    kwargs.setdefault('batches', 1 if max_workers == 1 else max_workers or os.cpu_count() or 1)
+    jobs = render_jobs(results, kill_thresholds, modes, time_array, jamming_level, output_dir,
+                       dpi=QUALITY_PRESETS[quality]['dpi'], **kwargs)
+    # Détail par graphique seulement en séquentiel : les processus de rendu ne remontent pas leurs mesures
+    with phase('rendu'):
+        if max_workers == 1:
+            outputs = [function(*args) for function, args in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+                futures = [executor.submit(function, *args) for function, args in jobs]
+                outputs = [future.result() for future in futures]
+    # Les lots de graphiques par système retournent une liste de fichiers, les autres tâches un seul
+    return [path for output in outputs for path in (output if isinstance(output, list) else [output])]
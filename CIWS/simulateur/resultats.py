@@ -0,0 +1,120 @@
+"""Stockage compact des résultats : trajectoires une fois par scénario, séries en float32 ou résumés seuls."""
+from collections.abc import Mapping
+
+import numpy as np
+
+from .moteur import impact_step, result_trajectory
+from .profilage import counted, phase
+
+
+@counted()
+def summarize(hits, dt, time_array, kill_threshold):
+    # Résumé d'un tenseur (système, mode, temps) de hits par pas : totaux, instant où le seuil de destruction
+    # est atteint (NaN si jamais) et cadence de coups maximale (hits/s), chacun de forme (système, mode)
+    cumulative = np.cumsum(hits, axis=2)
+    totals = cumulative[:, :, -1].copy() if hits.shape[2] else np.zeros(hits.shape[:2])
+    reached = cumulative >= np.asarray(kill_threshold, dtype=float)[:, None, None]
+    first = reached.argmax(axis=2)
+    time_to_threshold = np.where(reached.any(axis=2), np.asarray(time_array, dtype=float)[first], np.nan)
+    peak_rate = hits.max(axis=2, initial=0.0) / dt
+    return totals, time_to_threshold, peak_rate
+
+
+class ResultStore(Mapping):
+    # Même accès que le dictionnaire de build_results (results[nom][mode]['hits'], ...) mais :
+    # - x, y, z stockés une fois par mode et non par système ;
+    # - un seul tenseur de hits par pas (dtype au choix), hits_per_sec et cumulative_hits recalculés à la lecture ;
+    # - summary_only : ni trajectoires ni séries, seulement totaux, temps jusqu'au seuil et cadence maximale.
+    def __init__(self, names, modes, time_array, dt, kill_threshold, totals, time_to_threshold, peak_rate,
+                 trajectories=None, hits=None, n_steps=None):
+        self.names = list(names)
+        self.modes = list(modes)
+        self.time_array = time_array
+        self.dt = dt
+        self.kill_threshold = np.asarray(kill_threshold, dtype=float)
+        self.totals = totals
+        self.time_to_threshold = time_to_threshold
+        self.peak_rate = peak_rate
+        self.trajectories = trajectories
+        self.hits = hits
+        self.n_steps = n_steps
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_hits(cls, missile, catalog, modes, time_array, dt, hits, cache=None, dtype=np.float64,
+                  summary_only=False):
+        # Les résumés sont calculés en float64 avant une éventuelle conversion en float32
+        with phase('résultats'):
+            totals, time_to_threshold, peak_rate = summarize(hits, dt, time_array, catalog['kill_threshold'])
+            if summary_only:
+                return cls(catalog['name'], modes, None, dt, catalog['kill_threshold'], totals, time_to_threshold,
+                           peak_rate)
+            trajectories = np.empty((len(modes), 3, len(time_array)), dtype=dtype)
+            for j, mode in enumerate(modes):
+                trajectory = cache.get(missile, mode, time_array) if cache is not None else None
+                trajectories[j] = result_trajectory(missile, mode, time_array, trajectory)
+            return cls(catalog['name'], modes, time_array, dt, catalog['kill_threshold'], totals, time_to_threshold,
+                       peak_rate, trajectories, hits.astype(dtype, copy=False), impact_step(missile, time_array))
+
+    @property
+    def summary_only(self):
+        return self.hits is None
+
+    @property
+    def nbytes(self):
+        arrays = (self.totals, self.time_to_threshold, self.peak_rate, self.trajectories, self.hits)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def __getitem__(self, name):
+        if name not in self._index:
+            raise KeyError(name)
+        return SystemResults(self, name)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def result(self, name, mode):
+        # Entrée results[nom][mode] ; les séries sont des vues ou des tableaux recalculés, jamais stockés
+        i, j = self._index[name], self.modes.index(mode)
+        entry = {'hits': self.totals[i, j], 'time_to_threshold': self.time_to_threshold[i, j],
+                 'peak_rate': self.peak_rate[i, j]}
+        if self.summary_only:
+            return entry
+        cumulative = np.cumsum(self.hits[i, j], dtype=float)
+        cumulative[self.n_steps:] = 0
+        x, y, z = self.trajectories[j]
+        entry.update({'x': x, 'y': y, 'z': z, 'hits_per_sec': self.hits[i, j] / self.dt,
+                      'cumulative_hits': cumulative})
+        return entry
+
+    @property
+    def neutralized(self):
+        return self.totals >= self.kill_threshold[:, None]
+
+
+class SystemResults(Mapping):
+    # results[nom] d'un ResultStore : chaque mode n'est construit qu'à sa première lecture, puis gardé tant que
+    # la vue est référencée. Transmise à un autre processus, la vue devient un dictionnaire ordinaire.
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self._entries = {}
+
+    def __getitem__(self, mode):
+        if mode not in self._entries:
+            if mode not in self.store.modes:
+                raise KeyError(mode)
+            self._entries[mode] = self.store.result(self.name, mode)
+        return self._entries[mode]
+
+    def __iter__(self):
+        return iter(self.store.modes)
+
+    def __len__(self):
+        return len(self.store.modes)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
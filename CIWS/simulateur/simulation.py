@@ -0,0 +1,52 @@
+"""Scénarios et simulations explicites : aucun état global, plusieurs scénarios simultanés dans un même processus."""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from .catalogue import Catalogue
+from .modele import EXOCET_MM40, Missile
+from .moteur import evaluate_catalog
+from .resultats import ResultStore
+from .trajectoires import TrajectoryCache
+
+
+@dataclass(frozen=True)
+class Scenario:
+    # Paramètres d'un engagement : missile, modes de vol, pas de temps et niveau de brouillage
+    missile: dict = field(default_factory=lambda: dict(EXOCET_MM40))
+    modes: tuple = (1, 2, 3, 4)
+    dt: float = 0.01
+    jamming_level: float = 0.2
+
+    def build_missile(self):
+        return Missile(**self.missile)
+
+    def time_array(self):
+        total_time = self.missile['range'] / self.missile['speed']
+        return np.arange(0, total_time + self.dt, self.dt)
+
+    def replace(self, **changes):
+        # Variante du scénario, ex. scenario.replace(jamming_level=0.5)
+        return replace(self, **changes)
+
+
+class Simulation:
+    # Un catalogue et un cache de trajectoires propres à l'instance ; run() ne modifie ni l'un ni l'autre
+    # (le cache est protégé par un verrou), les scénarios peuvent donc s'exécuter en parallèle.
+    def __init__(self, catalogue=None, trajectories=None):
+        self.catalogue = catalogue if catalogue is not None else Catalogue.from_csv()
+        self.trajectories = trajectories if trajectories is not None else TrajectoryCache()
+
+    def run(self, scenario, dtype=np.float64, summary_only=False):
+        missile = scenario.build_missile()
+        time_array = scenario.time_array()
+        hits = evaluate_catalog(missile, self.catalogue, scenario.modes, time_array, scenario.dt,
+                                scenario.jamming_level, cache=self.trajectories)
+        return ResultStore.from_hits(missile, self.catalogue, scenario.modes, time_array, scenario.dt, hits,
+                                     cache=self.trajectories, dtype=dtype, summary_only=summary_only)
+
+    def run_many(self, scenarios, max_workers=None, **kwargs):
+        # Scénarios exécutés dans des threads du processus courant ; résultats dans l'ordre des scénarios
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda scenario: self.run(scenario, **kwargs), scenarios))
@@ -0,0 +1,251 @@
+"""Cache des trajectoires du missile, partagé par tous les systèmes CIWS évalués sur une même grille de temps,
+et tables d'interpolation pour les positions à des instants quelconques.
+
+Vérification des bornes d'erreur des tables : python -m simulateur.trajectoires
+"""
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _missile_key(missile):
+    # Paramètres du missile (amplitude du zigzag comprise) sous une forme hachable
+    return tuple(sorted((name, float(value) if isinstance(value, (int, float, np.number)) else value)
+                        for name, value in vars(missile).items()))
+
+
+def _grid_key(time_array):
+    # Empreinte du contenu de la grille : hash() n'est pas sûr contre les collisions, qui serviraient en silence
+    # des trajectoires calculées sur une autre grille
+    times = np.ascontiguousarray(time_array, dtype=float)
+    return times.shape, times.dtype.str, hashlib.blake2b(times.tobytes()).hexdigest()
+
+
+# Décalage des nœuds aux ruptures de phase : chaque segment est échantillonné de son côté de la rupture
+BOUNDARY_OFFSET = 1e-9  # s
+# Marge d'arrondi flottant ajoutée aux bornes d'erreur
+ROUNDING = 1e-9  # m
+INTERPOLATIONS = ('linear', 'cubic')
+
+
+def phase_breaks(missile, mode):
+    # Instants où y ou z change de loi (début du zigzag, début du pop-up) : valeur ou dérivée discontinue
+    total_time = missile.range / missile.speed
+    breaks = []
+    if mode == 2:
+        breaks.append((missile.range - missile.zigzag_start) / missile.speed)
+    elif mode == 4:
+        breaks.append((missile.range - missile.zigzag_start) / missile.speed - missile.popup_time)
+    if mode in (3, 4):
+        breaks.append(total_time - missile.popup_time)
+    return sorted(t for t in set(breaks) if 0 < t < total_time)
+
+
+def derivative_bounds(missile, mode):
+    # Majorants de |f'|, |f''| et |f''''| sur chaque phase, pour y (zigzag sinusoïdal) et z (pop-up parabolique)
+    y = z = (0.0, 0.0, 0.0)
+    if mode in (2, 4):
+        omega = 2 * np.pi * missile.speed / missile.zigzag_period
+        y = (missile.amplitude * omega, missile.amplitude * omega ** 2, missile.amplitude * omega ** 4)
+    if mode in (3, 4):
+        curvature = 8 * abs(missile.popup_altitude - missile.impact_altitude) / missile.popup_time ** 2
+        z = (curvature * missile.popup_time / 2, curvature, 0.0)
+    return y, z
+
+
+class TrajectoryTable:
+    # Trajectoire (missile, mode) échantillonnée sur une grille fine, indépendante de la grille de simulation,
+    # interrogée à des instants quelconques par interpolation vectorisée. La grille est découpée aux ruptures de
+    # phase (phase_breaks) : aucun intervalle ne chevauche un changement de loi, les bornes ci-dessous valent
+    # donc partout. Avec h <= step, par phase :
+    #   - linéaire : |erreur| <= max|f''| h² / 8 ;
+    #   - cubique (Lagrange sur 4 nœuds) : |erreur| <= max|f''''| h⁴ / 24, nulle sur le pop-up (parabole) ;
+    # plus max|f'| * BOUNDARY_OFFSET (nœuds d'extrémité décalés) et ROUNDING (voir error_bound).
+    # Exocet MM40, step = 0,01 s : zigzag 0,6 mm en linéaire, 7e-8 m en cubique. x, affine en t, est exact.
+    # À un instant de rupture exact, la valeur retournée est la limite à droite ; à moins de BOUNDARY_OFFSET
+    # d'une rupture où y ou z est discontinu (ex. impact_altitude != base_altitude), elle peut être celle de
+    # l'autre phase.
+    def __init__(self, missile, mode, step=0.01, method='linear'):
+        if method not in INTERPOLATIONS:
+            raise ValueError(f"Interpolation inconnue : {method!r}")
+        self.missile = missile
+        self.mode = mode
+        self.step = step
+        self.method = method
+        self.total_time = missile.range / missile.speed
+
+        self.edges = np.array([0.0] + phase_breaks(missile, mode) + [self.total_time])
+        lengths = np.diff(self.edges)
+        # Au moins 3 intervalles par phase pour le gabarit cubique
+        self.counts = np.maximum(3, np.ceil(lengths / step - 1e-9)).astype(np.intp)
+        self.steps = lengths / self.counts
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts + 1)[:-1]]).astype(np.intp)
+        knots = np.concatenate([np.clip(start + h * np.arange(n + 1), start + min(BOUNDARY_OFFSET, h / 4),
+                                        end - min(BOUNDARY_OFFSET, h / 4))
+                                for start, end, h, n in zip(self.edges[:-1], self.edges[1:], self.steps, self.counts)])
+        _, self.y, self.z = missile.positions(knots, self.total_time, mode)
+        for array in (self.y, self.z):
+            array.flags.writeable = False
+
+    @property
+    def nbytes(self):
+        return self.y.nbytes + self.z.nbytes
+
+    def error_bound(self):
+        # Bornes d'erreur (m) sur y et z pour cette table
+        h = float(self.steps.max())
+        bounds = []
+        for first, second, fourth in derivative_bounds(self.missile, self.mode):
+            interpolation = second * h ** 2 / 8 if self.method == 'linear' else fourth * h ** 4 / 24
+            bounds.append(interpolation + first * BOUNDARY_OFFSET + ROUNDING)
+        return tuple(bounds)
+
+    def __call__(self, times):
+        # Positions x, y, z aux instants demandés (au-delà de l'impact : position d'impact, comme Missile.positions)
+        times = np.minimum(np.asarray(times, dtype=float), self.total_time)
+        t = np.maximum(times, 0.0)
+        segment = np.minimum(np.searchsorted(self.edges, t, side='right') - 1, self.counts.size - 1)
+        position = (t - self.edges[segment]) / self.steps[segment]
+        counts = self.counts[segment]
+        index = np.minimum(position.astype(np.intp), counts - 1)
+        if self.method == 'linear':
+            base = self.offsets[segment] + index
+            frac = position - index
+            y = self.y[base] + frac * (self.y[base + 1] - self.y[base])
+            z = self.z[base] + frac * (self.z[base + 1] - self.z[base])
+        else:
+            # Gabarit de 4 nœuds autour de l'intervalle, décalé vers l'intérieur aux extrémités de la phase
+            first = np.clip(index - 1, 0, counts - 3)
+            base = self.offsets[segment] + first
+            u = position - first
+            weights = (-(u - 1) * (u - 2) * (u - 3) / 6, u * (u - 2) * (u - 3) / 2,
+                       -u * (u - 1) * (u - 3) / 2, u * (u - 1) * (u - 2) / 6)
+            y = sum(w * self.y[base + k] for k, w in enumerate(weights))
+            z = sum(w * self.z[base + k] for k, w in enumerate(weights))
+        return self.missile.range - self.missile.speed * times, y, z
+
+
+class TrajectoryCache:
+    # Trajectoires indexées par (paramètres du missile, mode, grille de temps).
+    # interpolation=None : les positions hors grille sont recalculées exactement par Missile.positions ;
+    # interpolation='linear' ou 'cubic' : elles sont lues dans une TrajectoryTable de pas table_step (par défaut
+    # le pas de la grille de simulation), construite une fois par (missile, mode). Avec le modèle analytique
+    # actuel, le calcul exact reste le plus rapide : les tables servent aux trajectoires coûteuses à évaluer.
+    def __init__(self, max_entries=64, interpolation=None, table_step=None):
+        if interpolation not in INTERPOLATIONS + (None,):
+            raise ValueError(f"Interpolation inconnue : {interpolation!r}")
+        self.max_entries = max_entries
+        self.interpolation = interpolation
+        self.table_step = table_step
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # cache partageable entre threads
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+
+        # Calcul hors verrou : deux threads peuvent calculer la même entrée, le résultat est identique
+        computed = compute()
+        with self._lock:
+            self.misses += 1
+            entry = self._entries.setdefault(key, computed)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, missile, mode, time_array):
+        # Tableaux x, y, z sur la grille, calculés au premier appel puis partagés (lecture seule)
+        def compute():
+            trajectory = missile.positions(np.array(time_array, dtype=float), missile.range / missile.speed, mode)
+            for array in trajectory:
+                array.flags.writeable = False
+            return trajectory
+        return self._lookup((_missile_key(missile), mode, _grid_key(time_array)), compute)
+
+    def table(self, missile, mode, step):
+        return self._lookup(('table', _missile_key(missile), mode, float(step), self.interpolation),
+                            lambda: TrajectoryTable(missile, mode, step, self.interpolation))
+
+    def at(self, missile, mode, time_array, times):
+        # Position à des instants quelconques (ex. t + temps de vol des projectiles) : calcul exact, ou lecture
+        # dans la table d'interpolation (bornes d'erreur : TrajectoryTable.error_bound)
+        times = np.asarray(times, dtype=float)
+        if self.interpolation is None:
+            return missile.positions(times, missile.range / missile.speed, mode)
+        step = self.table_step or float(np.diff(time_array).mean())
+        return self.table(missile, mode, step)(times)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+def check_tables(step=0.01, queries=200_000, seed=0):
+    # Erreur maximale de chaque table (4 modes, linéaire et cubique) contre Missile.positions sur des instants
+    # aléatoires et une grille dense, comparée à error_bound(). Retourne (conforme, lignes du tableau).
+    from .modele import EXOCET_MM40, Missile
+
+    rng = np.random.default_rng(seed)
+    rows = []
+    ok = True
+    for label, params in (("Exocet MM40", EXOCET_MM40),
+                          ("pop-up discontinu", dict(EXOCET_MM40, impact_altitude=1, zigzag_start=1300))):
+        missile = Missile(**params)
+        total_time = missile.range / missile.speed
+        times = np.concatenate([rng.uniform(0, total_time + 1, queries), np.linspace(0, total_time, queries + 1)])
+        for mode in (1, 2, 3, 4):
+            _, y_exact, z_exact = missile.positions(times, total_time, mode)
+            for method in INTERPOLATIONS:
+                table = TrajectoryTable(missile, mode, step, method)
+                _, y, z = table(times)
+                errors = (float(np.abs(y - y_exact).max()), float(np.abs(z - z_exact).max()))
+                bounds = table.error_bound()
+                ok = ok and all(error <= bound for error, bound in zip(errors, bounds))
+                rows.append((label, mode, method, errors, bounds))
+    return ok, rows
+
+
+def main():
+    ok, rows = check_tables()
+    print(f"{'Missile':<18} | {'Mode':>4} | {'Méthode':<7} | {'Erreur y':>9} | {'Borne y':>9} | {'Erreur z':>9} | "
+          f"{'Borne z':>9}")
+    print("-" * 84)
+    for label, mode, method, errors, bounds in rows:
+        print(f"{label:<18} | {mode:>4} | {method:<7} | {errors[0]:>9.2e} | {bounds[0]:>9.2e} | {errors[1]:>9.2e} | "
+              f"{bounds[1]:>9.2e}")
+
+    # Coût d'une requête vectorisée de 100 000 instants, calcul exact contre lecture de table
+    from .modele import EXOCET_MM40, Missile
+
+    missile = Missile(**EXOCET_MM40)
+    total_time = missile.range / missile.speed
+    times = np.random.default_rng(1).uniform(0, total_time, 100_000)
+    queries = {'exact': lambda t: missile.positions(t, total_time, 4)}
+    queries.update({method: TrajectoryTable(missile, 4, 0.01, method) for method in INTERPOLATIONS})
+    print()
+    for label, query in queries.items():
+        start = time.perf_counter()
+        for _ in range(20):
+            query(times)
+        print(f"Mode 4, 100 000 instants, {label:<7} : {(time.perf_counter() - start) / 20 * 1e3:.2f} ms")
+    print("Bornes respectées" if ok else "ÉCHEC : borne dépassée")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())